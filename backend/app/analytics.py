@@ -0,0 +1,348 @@
+"""
+Columnar analytics store for assessment history.
+
+Every scored session is flattened into two Parquet datasets:
+- `words`:    one row per alignment entry (target/recognized/status/error type)
+- `sessions`: one row per request (wpm, accuracy, scores, duration)
+
+Both are hive-partitioned by `language` and `date`, so aggregate queries only
+touch the partitions and columns they need.
+
+CLI usage:
+    python -m backend.app.analytics common-errors --language hi --limit 20
+    python -m backend.app.analytics error-rates --since 2026-01-01
+    python -m backend.app.analytics wpm-distribution --language en --bins 10
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_DIR = Path(os.getenv(
+    "PRONOUNCE_ANALYTICS_DIR",
+    str(Path(__file__).resolve().parent / "analytics_store")
+))
+
+# Rows are buffered in memory and written in batches so we don't end up with
+# one tiny Parquet file per request.
+FLUSH_ROWS = int(os.getenv("PRONOUNCE_ANALYTICS_FLUSH_ROWS", "5000"))
+
+WORD_SCHEMA = pa.schema([
+    ("session_id", pa.string()),
+    ("ts", pa.timestamp("ms", tz="UTC")),
+    ("position", pa.int32()),
+    ("target", pa.string()),
+    ("recognized", pa.string()),
+    ("status", pa.string()),
+    ("error_type", pa.string()),
+    ("similarity", pa.float32()),
+    ("language", pa.string()),
+    ("date", pa.string()),
+])
+
+SESSION_SCHEMA = pa.schema([
+    ("session_id", pa.string()),
+    ("ts", pa.timestamp("ms", tz="UTC")),
+    ("duration_sec", pa.float32()),
+    ("target_word_count", pa.int32()),
+    ("wpm", pa.int32()),
+    ("accuracy", pa.float32()),
+    ("fluency", pa.float32()),
+    ("overall_score", pa.float32()),
+    ("language", pa.string()),
+    ("date", pa.string()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("language", pa.string()), ("date", pa.string())]),
+    flavor="hive"
+)
+
+_lock = threading.Lock()
+_word_rows = []
+_session_rows = []
+
+
+# ---------------------------
+# Recording
+# ---------------------------
+
+def _error_types(alignment, error_report):
+    """
+    Pairs each alignment entry with its error classification.
+
+    `generate_analysis_report` emits exactly one error entry per substitution
+    or deletion, in alignment order, so we can walk both lists together
+    instead of recomputing similarity.
+    """
+    errors = iter(error_report)
+    for item in alignment:
+        status = item.get("status")
+        if status in ("substitution", "deletion"):
+            err = next(errors, {})
+            yield err.get("type", status), err.get("similarity")
+        elif status in ("insertion", "stutter"):
+            yield status, None
+        else:
+            yield None, None
+
+
+def record_assessment(session_id, language, alignment, metrics, error_report,
+                      duration_sec, overall_score):
+    """
+    Buffers one scored session for the columnar store.
+    Flushes to disk once FLUSH_ROWS word rows have accumulated.
+    """
+    now = datetime.now(timezone.utc)
+    date = now.strftime("%Y-%m-%d")
+
+    word_rows = []
+    for pos, (item, (e_type, similarity)) in enumerate(
+        zip(alignment, _error_types(alignment, error_report))
+    ):
+        word_rows.append({
+            "session_id": session_id,
+            "ts": now,
+            "position": pos,
+            "target": item.get("target", ""),
+            "recognized": item.get("recognized", ""),
+            "status": item.get("status", ""),
+            "error_type": e_type,
+            "similarity": similarity,
+            "language": language,
+            "date": date,
+        })
+
+    session_row = {
+        "session_id": session_id,
+        "ts": now,
+        "duration_sec": duration_sec,
+        "target_word_count": sum(1 for item in alignment if item.get("target")),
+        "wpm": metrics.get("wpm", 0),
+        "accuracy": metrics.get("accuracy", 0.0),
+        "fluency": metrics.get("fluency", 0.0),
+        "overall_score": overall_score,
+        "language": language,
+        "date": date,
+    }
+
+    with _lock:
+        _word_rows.extend(word_rows)
+        _session_rows.append(session_row)
+        should_flush = len(_word_rows) >= FLUSH_ROWS
+
+    if should_flush:
+        flush()
+
+
+def flush():
+    """Writes all buffered rows to the partitioned Parquet datasets."""
+    global _word_rows, _session_rows
+
+    with _lock:
+        word_rows, _word_rows = _word_rows, []
+        session_rows, _session_rows = _session_rows, []
+
+    if not session_rows:
+        return
+
+    start = time.time()
+    _write(pa.Table.from_pylist(word_rows, schema=WORD_SCHEMA), "words")
+    _write(pa.Table.from_pylist(session_rows, schema=SESSION_SCHEMA), "sessions")
+    logger.info(
+        f"📦 Analytics flushed: {len(session_rows)} sessions, "
+        f"{len(word_rows)} word rows in {round(time.time() - start, 3)}s"
+    )
+
+
+def _write(table, name):
+    if table.num_rows == 0:
+        return
+    ds.write_dataset(
+        table,
+        ANALYTICS_DIR / name,
+        format="parquet",
+        partitioning=PARTITIONING,
+        basename_template=f"part-{int(time.time() * 1000)}-{uuid.uuid4().hex}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_options=ds.ParquetFileFormat().make_write_options(compression="zstd"),
+    )
+
+
+# ---------------------------
+# Queries
+# ---------------------------
+
+def _dataset(name):
+    path = ANALYTICS_DIR / name
+    if not path.exists():
+        return None
+    return ds.dataset(path, format="parquet", partitioning=PARTITIONING)
+
+
+def _filter(language=None, since=None, until=None, extra=None):
+    """Builds a partition-prunable filter expression."""
+    expr = None
+    parts = []
+    if language:
+        parts.append(ds.field("language") == language)
+    if since:
+        parts.append(ds.field("date") >= since)
+    if until:
+        parts.append(ds.field("date") <= until)
+    if extra is not None:
+        parts.append(extra)
+    for p in parts:
+        expr = p if expr is None else expr & p
+    return expr
+
+
+def common_errors(language=None, since=None, until=None, limit=20):
+    """Most frequently missed target words, grouped by word and error type."""
+    dataset = _dataset("words")
+    if dataset is None:
+        return []
+
+    table = dataset.to_table(
+        columns=["target", "error_type"],
+        filter=_filter(language, since, until,
+                       extra=ds.field("error_type").isin(
+                           ["mispronunciation", "substitution", "deletion"]))
+    )
+    if table.num_rows == 0:
+        return []
+
+    grouped = table.group_by(["target", "error_type"]).aggregate([("target", "count")])
+    grouped = grouped.sort_by([("target_count", "descending")]).slice(0, limit)
+
+    return [
+        {"word": r["target"], "error_type": r["error_type"], "count": r["target_count"]}
+        for r in grouped.to_pylist()
+    ]
+
+
+def error_rates(language=None, since=None, until=None):
+    """Per-language error rates relative to the number of target words read."""
+    dataset = _dataset("words")
+    if dataset is None:
+        return []
+
+    table = dataset.to_table(
+        columns=["language", "status", "error_type"],
+        filter=_filter(language, since, until)
+    )
+    if table.num_rows == 0:
+        return []
+
+    is_target = pc.invert(pc.is_in(table["status"], pa.array(["insertion", "stutter"])))
+    table = table.append_column("is_target", pc.cast(is_target, pa.int64()))
+    for e_type in ("mispronunciation", "substitution", "deletion", "insertion", "stutter"):
+        flag = pc.fill_null(pc.equal(table["error_type"], e_type), False)
+        table = table.append_column(e_type, pc.cast(flag, pa.int64()))
+
+    grouped = table.group_by("language").aggregate([
+        ("is_target", "sum"),
+        ("mispronunciation", "sum"),
+        ("substitution", "sum"),
+        ("deletion", "sum"),
+        ("insertion", "sum"),
+        ("stutter", "sum"),
+    ])
+
+    results = []
+    for r in grouped.to_pylist():
+        total = max(r["is_target_sum"], 1)
+        results.append({
+            "language": r["language"],
+            "target_words": r["is_target_sum"],
+            "mispronunciation_rate": round(r["mispronunciation_sum"] / total, 4),
+            "substitution_rate": round(r["substitution_sum"] / total, 4),
+            "deletion_rate": round(r["deletion_sum"] / total, 4),
+            "insertion_rate": round(r["insertion_sum"] / total, 4),
+            "stutter_rate": round(r["stutter_sum"] / total, 4),
+        })
+    return sorted(results, key=lambda r: r["language"])
+
+
+def wpm_distribution(language=None, since=None, until=None, bins=10):
+    """Histogram and percentiles of session WPM."""
+    dataset = _dataset("sessions")
+    if dataset is None:
+        return {"sessions": 0, "histogram": [], "percentiles": {}}
+
+    table = dataset.to_table(columns=["wpm"], filter=_filter(language, since, until))
+    if table.num_rows == 0:
+        return {"sessions": 0, "histogram": [], "percentiles": {}}
+
+    wpm = table["wpm"].to_numpy()
+    counts, edges = np.histogram(wpm, bins=bins)
+    p50, p90, p99 = np.percentile(wpm, [50, 90, 99])
+
+    return {
+        "sessions": int(len(wpm)),
+        "histogram": [
+            {"from": round(float(edges[i]), 1), "to": round(float(edges[i + 1]), 1),
+             "count": int(counts[i])}
+            for i in range(len(counts))
+        ],
+        "percentiles": {"p50": float(p50), "p90": float(p90), "p99": float(p99)},
+    }
+
+
+QUERIES = {
+    "common-errors": common_errors,
+    "error-rates": error_rates,
+    "wpm-distribution": wpm_distribution,
+}
+
+
+def run_query(name, **params):
+    """Flushes pending rows and runs a named aggregate query."""
+    if name not in QUERIES:
+        raise KeyError(name)
+    flush()
+    params = {k: v for k, v in params.items() if v is not None}
+    return QUERIES[name](**params)
+
+
+# ---------------------------
+# CLI
+# ---------------------------
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate queries over assessment history.")
+    parser.add_argument("query", choices=sorted(QUERIES))
+    parser.add_argument("--language")
+    parser.add_argument("--since", help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--until", help="YYYY-MM-DD (inclusive)")
+    parser.add_argument("--limit", type=int, help="common-errors only")
+    parser.add_argument("--bins", type=int, help="wpm-distribution only")
+    args = parser.parse_args()
+    for name in ("limit", "bins"):
+        if getattr(args, name) is not None and getattr(args, name) < 1:
+            parser.error(f"--{name} must be at least 1")
+
+    params = {"language": args.language, "since": args.since, "until": args.until}
+    if args.query == "common-errors":
+        params["limit"] = args.limit
+    if args.query == "wpm-distribution":
+        params["bins"] = args.bins
+
+    print(json.dumps(run_query(args.query, **params), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import os
+import time
+from .transcribe import transcribe_with_words
+from .cascade import transcribe_cascade
+from .forced_align import transcribe_forced
+from .stub_asr import transcribe_stub
+from .transformers_asr import transcribe_transformers
+from .inference_client import INFERENCE_ADDRESS, transcribe_remote
+from .audio_io import TARGET_SAMPLE_RATE
+from .model_loader import acquire_model, routed
+from .model_swap import record_latency
+
+# "full": main model over the whole clip
+# "cascade": draft model first, main model only on weak regions
+# "forced": align audio to the target text, free-decode only poorly aligned spans
+# "stub": deterministic fake transcript, no model (load testing)
+ASR_MODE = os.getenv("PRONOUNCE_ASR_MODE", "full")
+
+
+# ---------------------------
+# Backends
+# ---------------------------
+# Every backend takes (audio_path, target_text, language, samples, model, mode)
+# and returns the `transcribe_with_words` structure:
+# {'text', 'words': [{word, original_word, start, end, duration, pause_before, confidence}], 'language_probs'}
+
+def _faster_whisper(audio_path, target_text, language, samples, model, mode):
+    if model:
+        # Language-specific checkpoint (hub name or artifact store entry): plain decode
+        with acquire_model(model) as whisper:
+            return transcribe_with_words(audio_path, language=language, samples=samples, model=whisper)
+    if mode == "cascade":
+        return transcribe_cascade(audio_path, target_text, language=language, samples=samples)
+    if mode == "forced":
+        return transcribe_forced(audio_path, target_text, language=language, samples=samples)
+    return transcribe_with_words(audio_path, language=language, samples=samples)
+
+
+def _transformers(audio_path, target_text, language, samples, model, mode):
+    return transcribe_transformers(audio_path, language=language, samples=samples, model_id=model)
+
+
+def _stub(audio_path, target_text, language, samples, model, mode):
+    return transcribe_stub(audio_path, target_text, samples=samples)
+
+
+BACKENDS = {
+    "faster-whisper": _faster_whisper,
+    "transformers": _transformers,
+    "stub": _stub,
+}
+
+
+def parse_routes(spec: str) -> dict:
+    """
+    "hi=transformers:ai4bharat/indicwav2vec-hindi,ta=faster-whisper:ta-small,*=faster-whisper"
+    -> {language: (backend, model or None)}. "*" is the fallback for other languages.
+    """
+    routes = {}
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        language, _, target = entry.partition("=")
+        backend, _, model = target.strip().partition(":")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown ASR backend '{backend}' in PRONOUNCE_ASR_ROUTES")
+        if backend == "transformers" and not model:
+            raise ValueError(f"The transformers backend needs a model id (route '{entry}')")
+        routes[language.strip()] = (backend, model or None)
+    routes.setdefault("*", ("faster-whisper", None))
+    return routes
+
+
+ASR_ROUTES = parse_routes(os.getenv("PRONOUNCE_ASR_ROUTES", "*=faster-whisper"))
+
+
+def route(language: str):
+    """(backend, model) configured for a language."""
+    return ASR_ROUTES.get(language, ASR_ROUTES["*"])
+
+
+def transcribe_local(audio_path, target_text, language="en", samples=None, mode=None, backend=None, model=None):
+    """
+    Runs ASR in this process with the backend routed for `language` (or the
+    explicit `backend` / `model`). The faster-whisper main model is the
+    deployment this request is routed to (active, or the A/B candidate).
+    """
+    mode = mode or ASR_MODE
+    if backend is None:
+        # Stub mode overrides every route
+        backend, model = route(language) if mode != "stub" else ("stub", None)
+
+    with routed() as deployment:
+        start = time.perf_counter()
+        result = BACKENDS[backend](audio_path, target_text, language, samples, model, mode)
+        label = deployment.label if backend == "faster-whisper" and not model else f"{backend}:{model or '-'}"
+        audio_sec = len(samples) / TARGET_SAMPLE_RATE if samples is not None else None
+        record_latency(label, time.perf_counter() - start, audio_sec)
+
+    stats = result.setdefault("asr_stats", {})
+    stats.update(backend=backend, model=label)
+    return result
+
+
+def transcribe(audio_path, target_text, language="en", samples=None):
+    """
+    Speech -> words with timestamps/confidence.
+    Goes to the shared inference server when PRONOUNCE_INFERENCE_ADDRESS is set,
+    otherwise loads the model in this process.
+    """
+    if INFERENCE_ADDRESS:
+        return transcribe_remote(audio_path, target_text, language=language, samples=samples, mode=ASR_MODE)
+    return transcribe_local(audio_path, target_text, language=language, samples=samples)
@@ -0,0 +1,78 @@
+import os
+import struct
+import numpy as np
+
+TARGET_SAMPLE_RATE = 16000
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+def open_pcm16_wav(path, sample_rate: int = TARGET_SAMPLE_RATE):
+    """
+    Fast path for uploads that are already in the pipeline format.
+
+    Parses the RIFF header and, if the file is mono 16-bit PCM at
+    `sample_rate`, returns a read-only int16 memmap over the data chunk
+    (no decode, no copy). Returns None for anything else so the caller
+    can fall back to the general pydub/ffmpeg decoder.
+    """
+    file_size = os.path.getsize(path)
+
+    with open(path, "rb") as f:
+        riff = f.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            return None
+
+        fmt_ok = False
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id = chunk[:4]
+            chunk_size = struct.unpack("<I", chunk[4:])[0]
+
+            if chunk_id == b"fmt ":
+                fmt = f.read(chunk_size)
+                if len(fmt) < 16:
+                    return None
+                audio_format, channels, rate, _, _, bits = struct.unpack("<HHIIHH", fmt[:16])
+                if audio_format == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                    # Sub-format GUID starts with the real format tag
+                    audio_format = struct.unpack("<H", fmt[24:26])[0]
+
+                fmt_ok = (
+                    audio_format == WAVE_FORMAT_PCM and channels == 1
+                    and rate == sample_rate and bits == 16
+                )
+                if not fmt_ok:
+                    return None
+                if chunk_size & 1:
+                    f.seek(1, 1)
+
+            elif chunk_id == b"data":
+                if not fmt_ok:
+                    return None
+                offset = f.tell()
+                break
+
+            else:
+                # Skip LIST/fact/etc. (chunks are word-aligned)
+                f.seek(chunk_size + (chunk_size & 1), 1)
+
+    # Streaming writers often leave the data size as 0 or 0xFFFFFFFF,
+    # so never trust it beyond what is actually on disk.
+    available = file_size - offset
+    if chunk_size == 0 or chunk_size > available:
+        chunk_size = available
+    n_samples = chunk_size // 2
+
+    if n_samples == 0:
+        return np.zeros(0, dtype=np.int16)
+
+    return np.memmap(path, dtype="<i2", mode="r", offset=offset, shape=(n_samples,))
+
+
+def pcm16_to_float32(pcm):
+    """Scales int16 PCM to the float32 [-1, 1] range Whisper and librosa expect (single allocation)."""
+    return np.multiply(pcm, 1.0 / 32768.0, dtype=np.float32)
@@ -1,7 +1,7 @@
 import numpy as np
 import librosa
 
-def compute_acoustic_clarity(audio_path: str, words: list) -> dict:
+def compute_acoustic_clarity(audio_path: str, words: list, samples=None) -> dict:
     """
     Analyzes audio quality independently of accent.
     
@@ -21,7 +21,10 @@ def compute_acoustic_clarity(audio_path: str, words: list) -> dict:
     # 2. Simple Signal Check (using Librosa)
     # Detects if audio is too quiet or noisy
     try:
-        y, sr = librosa.load(audio_path, sr=16000, duration=30)
+        if samples is not None:
+            y = samples[:16000 * 30]  # view, no copy
+        else:
+            y, sr = librosa.load(audio_path, sr=16000, duration=30)
         rms = librosa.feature.rms(y=y)
         avg_volume = np.mean(rms)
         
@@ -0,0 +1,188 @@
+"""
+Hardware auto-tuner for Whisper compute settings.
+
+Benchmarks model size x compute_type x cpu_threads x beam_size against a local
+fixture set and writes the best accuracy-vs-throughput configuration to the
+profile that `model_loader` loads at startup.
+
+Fixtures: a directory of audio files, each with a same-named `.txt` file
+holding the target text, e.g. `fixtures/story1.wav` + `fixtures/story1.txt`.
+
+Usage:
+    python -m backend.app.autotune fixtures/ --language en
+    python -m backend.app.autotune fixtures/ --models tiny.en,base.en,small.en --max-drift 2
+"""
+
+import argparse
+import itertools
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from faster_whisper import WhisperModel
+from faster_whisper.audio import decode_audio
+
+from .audio_io import TARGET_SAMPLE_RATE
+from .model_loader import DEVICE, PROFILE_PATH
+from .scoring import compute_text_score
+from .transcribe import transcribe_with_words
+
+AUDIO_SUFFIXES = {".wav", ".webm", ".flac", ".mp3", ".ogg", ".m4a"}
+
+
+def load_fixtures(fixture_dir: Path):
+    """Decodes every fixture once so decode cost is excluded from model timings."""
+    fixtures = []
+    for audio_path in sorted(fixture_dir.iterdir()):
+        text_path = audio_path.with_suffix(".txt")
+        if audio_path.suffix.lower() not in AUDIO_SUFFIXES or not text_path.exists():
+            continue
+        samples = decode_audio(str(audio_path), sampling_rate=TARGET_SAMPLE_RATE)
+        fixtures.append({
+            "name": audio_path.name,
+            "samples": samples,
+            "duration": len(samples) / TARGET_SAMPLE_RATE,
+            "target": text_path.read_text(encoding="utf-8").strip(),
+        })
+    return fixtures
+
+
+def run_fixture(model, fixture, language, beam_size):
+    start = time.perf_counter()
+    result = transcribe_with_words(
+        fixture["name"], language=language, samples=fixture["samples"],
+        model=model, beam_size=beam_size
+    )
+    elapsed = time.perf_counter() - start
+    accuracy = compute_text_score(fixture["target"], result["text"])["text_score"]
+    return elapsed, accuracy
+
+
+def benchmark(model, fixtures, language, beam_size, num_workers):
+    """
+    Sequential pass -> real-time factor and accuracy.
+    Concurrent pass (num_workers threads) -> throughput in audio-seconds per second.
+    """
+    audio_sec = sum(f["duration"] for f in fixtures)
+
+    timings, accuracies = [], []
+    for fixture in fixtures:
+        elapsed, accuracy = run_fixture(model, fixture, language, beam_size)
+        timings.append(elapsed)
+        accuracies.append(accuracy)
+
+    batch = fixtures * num_workers
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=num_workers) as pool:
+        list(pool.map(lambda f: run_fixture(model, f, language, beam_size), batch))
+    wall = time.perf_counter() - start
+
+    return {
+        "rtf": round(sum(timings) / audio_sec, 4),
+        "throughput": round(audio_sec * num_workers / wall, 2),
+        "accuracy": round(statistics.mean(accuracies), 2),
+    }
+
+
+def pick_best(results, max_drift, objective):
+    """Fastest configuration whose accuracy is within `max_drift` points of the most accurate one."""
+    best_accuracy = max(r["accuracy"] for r in results)
+    for r in results:
+        r["accuracy_drift"] = round(best_accuracy - r["accuracy"], 2)
+
+    eligible = [r for r in results if r["accuracy_drift"] <= max_drift]
+    if objective == "latency":
+        return min(eligible, key=lambda r: r["rtf"])
+    return max(eligible, key=lambda r: r["throughput"])
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    default_threads = sorted({max(1, cpu_count // 4), max(1, cpu_count // 2), cpu_count})
+    default_compute = "int8,int8_float32,float32" if DEVICE == "cpu" else "float16,int8_float16"
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", type=Path)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--models", default="tiny.en,base.en")
+    parser.add_argument("--compute-types", default=default_compute)
+    parser.add_argument("--threads", default=",".join(map(str, default_threads)))
+    parser.add_argument("--beam-sizes", default="1,3,5")
+    parser.add_argument("--max-drift", type=float, default=1.0,
+                        help="Max accuracy points below the best config (default: 1.0)")
+    parser.add_argument("--objective", choices=["throughput", "latency"], default="throughput")
+    parser.add_argument("--out", type=Path, default=PROFILE_PATH)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        parser.error(f"No fixtures (audio + .txt) found in {args.fixtures}")
+    print(f"Loaded {len(fixtures)} fixtures ({round(sum(f['duration'] for f in fixtures), 1)}s audio)")
+
+    beam_sizes = [int(b) for b in args.beam_sizes.split(",")]
+    grid = itertools.product(
+        args.models.split(","),
+        args.compute_types.split(","),
+        [int(t) for t in args.threads.split(",")],
+    )
+
+    results = []
+    for model_size, compute_type, cpu_threads in grid:
+        # Fill the machine: one worker per `cpu_threads` slice of cores
+        num_workers = max(1, cpu_count // cpu_threads)
+        try:
+            model = WhisperModel(
+                model_size, device=DEVICE, compute_type=compute_type,
+                cpu_threads=cpu_threads, num_workers=num_workers
+            )
+        except (ValueError, RuntimeError) as e:
+            print(f"Skipping {model_size}/{compute_type}: {e}")
+            continue
+
+        for beam_size in beam_sizes:
+            stats = benchmark(model, fixtures, args.language, beam_size, num_workers)
+            row = {
+                "model_size": model_size,
+                "compute_type": compute_type,
+                "cpu_threads": cpu_threads,
+                "num_workers": num_workers,
+                "beam_size": beam_size,
+                **stats,
+            }
+            results.append(row)
+            print(
+                f"{model_size:<10} {compute_type:<14} threads={cpu_threads:<3} workers={num_workers:<3} "
+                f"beam={beam_size}  rtf={stats['rtf']:<7} thr={stats['throughput']:<7} acc={stats['accuracy']}"
+            )
+        del model
+
+    if not results:
+        raise SystemExit("No configuration could be benchmarked.")
+
+    best = pick_best(results, args.max_drift, args.objective)
+
+    profile = {
+        "device": DEVICE,
+        "model_size": best["model_size"],
+        "compute_type": best["compute_type"],
+        "cpu_threads": best["cpu_threads"],
+        "num_workers": best["num_workers"],
+        "beam_size": best["beam_size"],
+        "tuned_at": datetime.now(timezone.utc).isoformat(),
+        "host": {"cpu_count": cpu_count},
+        "objective": args.objective,
+        "max_drift": args.max_drift,
+        "selected": best,
+        "results": results,
+    }
+    args.out.write_text(json.dumps(profile, indent=2))
+    print(f"Selected {best['model_size']}/{best['compute_type']} threads={best['cpu_threads']} "
+          f"beam={best['beam_size']} -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Per-request cancellation.
+
+Each request gets a CancellationToken that fires when the client disconnects
+or the request deadline passes. The token lives in a context variable so the
+pipeline stages (transcription segments, cascade spans, alignment windows)
+can check it without threading it through every signature.
+"""
+
+import contextvars
+import os
+import threading
+import time
+
+# Seconds; 0 disables the deadline
+REQUEST_DEADLINE_SEC = float(os.getenv("PRONOUNCE_REQUEST_DEADLINE_SEC", "300"))
+
+_current = contextvars.ContextVar("cancellation_token", default=None)
+
+_stats_lock = threading.Lock()
+_stats = {
+    "cancelled": 0,
+    "by_reason": {},
+    "by_stage": {},
+    "audio_sec_skipped": 0.0,
+}
+
+
+class RequestCancelled(Exception):
+    def __init__(self, reason, stage):
+        super().__init__(f"Request cancelled ({reason}) during {stage}")
+        self.reason = reason
+        self.stage = stage
+
+
+class CancellationToken:
+    def __init__(self, deadline_sec: float = REQUEST_DEADLINE_SEC):
+        self._event = threading.Event()
+        self.reason = None
+        self.deadline = time.monotonic() + deadline_sec if deadline_sec else None
+        self.audio_sec_skipped = 0.0
+
+    def cancel(self, reason: str = "client_disconnected"):
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline and time.monotonic() > self.deadline:
+            self.cancel("deadline_exceeded")
+        return self._event.is_set()
+
+    def check(self, stage: str):
+        if self.cancelled:
+            raise RequestCancelled(self.reason, stage)
+
+
+def activate(token: CancellationToken):
+    """Makes `token` the current request's token (call inside the worker thread)."""
+    return _current.set(token)
+
+
+def current_token():
+    return _current.get()
+
+
+def check_cancelled(stage: str, audio_sec_remaining: float = 0.0):
+    """
+    Raises RequestCancelled if the current request was cancelled.
+    `audio_sec_remaining` is the audio that will not be processed because of it.
+    No-op outside a request.
+    """
+    token = _current.get()
+    if token is not None and token.cancelled:
+        token.audio_sec_skipped += max(0.0, audio_sec_remaining)
+        raise RequestCancelled(token.reason, stage)
+
+
+def record_cancellation(exc: RequestCancelled):
+    token = _current.get()
+    skipped = token.audio_sec_skipped if token else 0.0
+    with _stats_lock:
+        _stats["cancelled"] += 1
+        _stats["by_reason"][exc.reason] = _stats["by_reason"].get(exc.reason, 0) + 1
+        _stats["by_stage"][exc.stage] = _stats["by_stage"].get(exc.stage, 0) + 1
+        _stats["audio_sec_skipped"] += skipped
+
+
+def get_stats() -> dict:
+    with _stats_lock:
+        return {
+            "cancelled": _stats["cancelled"],
+            "by_reason": dict(_stats["by_reason"]),
+            "by_stage": dict(_stats["by_stage"]),
+            "audio_sec_skipped": round(_stats["audio_sec_skipped"], 1),
+        }
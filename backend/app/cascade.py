@@ -0,0 +1,242 @@
+"""
+Confidence-gated model cascade.
+
+1. Draft pass: small model, greedy decoding, whole clip.
+2. Align the draft against the (known) target text.
+3. Re-decode only the weak regions (low word probability or alignment
+   errors) with the main model / tuned beam size.
+4. Splice the escalated words back into the draft.
+"""
+
+import os
+import time
+import logging
+from difflib import SequenceMatcher
+
+from faster_whisper.audio import decode_audio
+
+from .audio_io import TARGET_SAMPLE_RATE
+from .cancellation import check_cancelled
+from .model_loader import acquire_model
+from .progress import muted
+from .scoring import tokenize
+from .transcribe import transcribe_with_words
+
+logger = logging.getLogger(__name__)
+
+DRAFT_MODEL = os.getenv("PRONOUNCE_CASCADE_DRAFT_MODEL", "tiny.en")
+# Draft for other languages when DRAFT_MODEL is English-only (e.g. "tiny");
+# unset = no cascade for them: an English draft would escalate nearly everything.
+MULTILINGUAL_DRAFT_MODEL = os.getenv("PRONOUNCE_CASCADE_MULTILINGUAL_DRAFT_MODEL")
+CONFIDENCE_THRESHOLD = float(os.getenv("PRONOUNCE_CASCADE_MIN_CONFIDENCE", "0.6"))
+
+SPAN_PADDING_SEC = 0.3      # context around each weak word
+MIN_SPAN_SEC = 1.0          # Whisper is unreliable on very short clips
+MERGE_GAP_SEC = 0.5         # join weak regions closer than this
+MAX_ESCALATED_FRACTION = 0.6  # beyond this, one full pass is cheaper than many pieces
+
+# Running real-time factor of the main model, used to estimate what a
+# full main-model pass would have cost (for the reported speedup).
+_main_rtf = None
+
+
+def _update_main_rtf(elapsed, audio_sec):
+    global _main_rtf
+    if audio_sec <= 0:
+        return
+    rtf = elapsed / audio_sec
+    _main_rtf = rtf if _main_rtf is None else 0.8 * _main_rtf + 0.2 * rtf
+
+
+def draft_model_for(language):
+    """The draft model for a language, or None if the cascade should be skipped."""
+    if language == "en" or not DRAFT_MODEL.endswith(".en"):
+        return DRAFT_MODEL
+    return MULTILINGUAL_DRAFT_MODEL
+
+
+def _mid(w):
+    return (w["start"] + w["end"]) / 2
+
+
+def find_weak_spans(words, target_text, duration):
+    """
+    Returns merged spans (see `merge_spans`) that need re-decoding: words below
+    CONFIDENCE_THRESHOLD, words in non-equal alignment opcodes, and gaps
+    where target words were skipped.
+    """
+    target_tokens = tokenize(target_text)
+
+    rec_tokens, owners = [], []
+    for i, w in enumerate(words):
+        for token in tokenize(w["word"]):
+            rec_tokens.append(token)
+            owners.append(i)
+
+    weak = {i for i, w in enumerate(words) if w["confidence"] < CONFIDENCE_THRESHOLD}
+    spans = []
+
+    sm = SequenceMatcher(None, target_tokens, rec_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in sm.get_opcodes():
+        if tag == "equal":
+            continue
+        if j2 > j1:
+            weak.update(owners[j1:j2])
+        else:
+            # Deletion: the missing words sit between the neighbouring recognized
+            # words. Their timestamps usually touch, so the gap is widened (up to
+            # the neighbours' midpoints) to leave the recovered words room.
+            left = words[owners[j1 - 1]] if j1 > 0 else None
+            right = words[owners[j1]] if j1 < len(owners) else None
+            start = max(left["end"] - SPAN_PADDING_SEC, _mid(left)) if left else 0.0
+            end = min(right["start"] + SPAN_PADDING_SEC, _mid(right)) if right else duration
+            spans.append((start, end))
+
+    spans.extend((words[i]["start"], words[i]["end"]) for i in weak)
+    return merge_spans(spans, duration)
+
+
+def merge_spans(spans, duration):
+    """
+    (start, end) regions -> merged (start, end, core_start, core_end) spans.
+    start/end include the decoding context (padding, minimum length); the
+    core is the region itself, which is all the re-decode may replace.
+    """
+    padded = []
+    for core_start, core_end in spans:
+        start, end = core_start - SPAN_PADDING_SEC, core_end + SPAN_PADDING_SEC
+        if end - start < MIN_SPAN_SEC:
+            mid = (start + end) / 2
+            start, end = mid - MIN_SPAN_SEC / 2, mid + MIN_SPAN_SEC / 2
+        padded.append((max(0.0, start), min(duration, end), core_start, core_end))
+
+    merged = []
+    for start, end, core_start, core_end in sorted(padded):
+        if merged and start - merged[-1][1] <= MERGE_GAP_SEC:
+            prev = merged[-1]
+            merged[-1] = (prev[0], max(prev[1], end), min(prev[2], core_start), max(prev[3], core_end))
+        else:
+            merged.append((start, end, core_start, core_end))
+    return merged
+
+
+def decode_spans(audio_path, samples, spans, language):
+    """
+    Free-decodes each merged span with the main model; timestamps are made
+    absolute. Returns [((core_start, core_end), words)].
+    """
+    decoded = []
+    # Partial text was already streamed by the first pass; re-decodes stay quiet
+    with muted():
+        for i, (span_start, span_end, core_start, core_end) in enumerate(spans):
+            check_cancelled("span_decoding", sum(span[1] - span[0] for span in spans[i:]))
+            clip = samples[int(span_start * TARGET_SAMPLE_RATE):int(span_end * TARGET_SAMPLE_RATE)]
+            span_result = transcribe_with_words(audio_path, language=language, samples=clip)
+            for w in span_result["words"]:
+                w["start"] = round(w["start"] + span_start, 3)
+                w["end"] = round(w["end"] + span_start, 3)
+            decoded.append(((core_start, core_end), span_result["words"]))
+    return decoded
+
+
+def splice_words(draft_words, escalated):
+    """
+    Replaces the draft words of each escalated core with the re-decoded ones.
+    The same midpoint rule (strictly inside the core) picks both sides, so
+    every word comes from one pass only; re-decoded words from the padding are dropped, as is a
+    re-decoded word that mostly overlaps a kept draft word of the same text.
+    """
+    def in_core(w):
+        return any(start < _mid(w) < end for (start, end), _ in escalated)
+
+    words = [w for w in draft_words if not in_core(w)]
+    kept_draft = list(words)
+    for (start, end), span_words in escalated:
+        for w in span_words:
+            if not start < _mid(w) < end:
+                continue
+            if any(d["word"] == w["word"]
+                   and min(d["end"], w["end"]) - max(d["start"], w["start"]) > (w["end"] - w["start"]) / 2
+                   for d in kept_draft):
+                continue
+            words.append(w)
+    words.sort(key=lambda w: w["start"])
+
+    prev_end = 0.0
+    for w in words:
+        w["pause_before"] = round(max(0.0, w["start"] - prev_end), 3)
+        prev_end = w["end"]
+    return words
+
+
+def transcribe_cascade(audio_path, target_text, language="en", samples=None):
+    """
+    Cascade variant of `transcribe_with_words`. Returns the same
+    {'text', 'words', 'language_probs'} structure plus an 'asr_stats' dict.
+    """
+    if samples is None:
+        samples = decode_audio(str(audio_path), sampling_rate=TARGET_SAMPLE_RATE)
+    duration = len(samples) / TARGET_SAMPLE_RATE
+
+    draft_name = draft_model_for(language)
+    if draft_name is None:
+        logger.info(f"🪜 Cascade skipped: {DRAFT_MODEL} is English-only, running main model for '{language}'.")
+        result = transcribe_with_words(audio_path, language=language, samples=samples)
+        result["asr_stats"] = {"draft_model": None, "skipped": f"{DRAFT_MODEL} is English-only"}
+        return result
+
+    # 1. Draft pass (small model, greedy)
+    start = time.perf_counter()
+    with acquire_model(draft_name) as draft_model:
+        draft = transcribe_with_words(
+            audio_path, language=language, samples=samples,
+            model=draft_model, beam_size=1
+        )
+    draft_sec = time.perf_counter() - start
+
+    # 2. Find weak regions against the known target
+    spans = find_weak_spans(draft["words"], target_text, duration)
+    escalated_sec = sum(span[1] - span[0] for span in spans)
+    fraction = escalated_sec / duration if duration else 0.0
+
+    # 3. Escalate
+    start = time.perf_counter()
+    if fraction > MAX_ESCALATED_FRACTION:
+        logger.info(f"🪜 Cascade: {round(fraction * 100)}% weak, running full main-model pass.")
+        result = transcribe_with_words(audio_path, language=language, samples=samples)
+        escalated_sec, fraction = duration, 1.0
+        words = result["words"]
+        language_probs = result["language_probs"]
+    else:
+        escalated = decode_spans(audio_path, samples, spans, language)
+        words = splice_words(draft["words"], escalated)
+        language_probs = draft["language_probs"]
+    escalation_sec = time.perf_counter() - start
+
+    if escalated_sec > 0:
+        _update_main_rtf(escalation_sec, escalated_sec)
+
+    total_sec = draft_sec + escalation_sec
+    est_full_sec = _main_rtf * duration if _main_rtf is not None else None
+
+    stats = {
+        "draft_model": draft_name,
+        "spans": len(spans) if fraction < 1.0 else 1,
+        "escalated_sec": round(escalated_sec, 2),
+        "escalated_fraction": round(fraction, 3),
+        "draft_sec": round(draft_sec, 3),
+        "escalation_sec": round(escalation_sec, 3),
+        "estimated_full_sec": round(est_full_sec, 3) if est_full_sec is not None else None,
+        "estimated_speedup": round(est_full_sec / total_sec, 2) if est_full_sec and total_sec else None,
+    }
+    logger.info(
+        f"🪜 Cascade: escalated {stats['escalated_fraction'] * 100:.1f}% of audio "
+        f"in {stats['spans']} span(s), speedup ≈ {stats['estimated_speedup']}x"
+    )
+
+    return {
+        "text": " ".join(w["original_word"] for w in words),
+        "words": words,
+        "language_probs": language_probs,
+        "asr_stats": stats,
+    }
@@ -0,0 +1,184 @@
+"""
+Forced alignment against the known target passage.
+
+Instead of open-vocabulary beam search, the target words are teacher-forced
+through Whisper's decoder and placed on the audio with its cross-attention
+alignment heads (the same DTW machinery faster-whisper uses for
+word_timestamps). This costs one encoder pass plus one decoder forward per
+30s window.
+
+Words the model finds unlikely (misread, skipped) and long unexplained gaps
+(possible insertions) are free-decoded with the main model and spliced in.
+"""
+
+import math
+import os
+import time
+import logging
+
+from faster_whisper.audio import decode_audio, pad_or_trim
+from faster_whisper.tokenizer import Tokenizer
+
+from .audio_io import TARGET_SAMPLE_RATE
+from .cancellation import check_cancelled
+from .cascade import decode_spans, merge_spans, splice_words
+from .model_loader import acquire_model, get_model
+from .progress import emit
+from .scoring import normalize_text
+
+logger = logging.getLogger(__name__)
+
+MIN_WORD_PROBABILITY = float(os.getenv("PRONOUNCE_FA_MIN_PROBABILITY", "0.3"))
+
+MAX_WORDS_PER_SEC = 4.0     # upper bound on reading rate when sizing a window's text
+WINDOW_TAIL_MARGIN_SEC = 2.0  # words ending this close to a window edge are re-aligned in the next window
+MAX_GAP_SEC = 1.5           # unexplained silence/speech between aligned words -> free decode
+MAX_TEXT_TOKENS = 400       # stay under Whisper's 448 token context
+
+
+def _align_window(model, tokenizer, features, frame_start, window_words):
+    """
+    Aligns `window_words` to the 30s window starting at `frame_start`.
+    Returns [(word, start, end, probability)] relative to the window, or
+    None if the model's word split doesn't match ours.
+    """
+    n_frames = model.feature_extractor.nb_max_frames
+    segment = features[:, frame_start:frame_start + n_frames]
+    content_frames = segment.shape[-1]
+
+    encoder_output = model.encode(pad_or_trim(segment))
+
+    text_tokens = tokenizer.encode(" " + " ".join(window_words))
+    while len(text_tokens) > MAX_TEXT_TOKENS and len(window_words) > 1:
+        # Scripts with many tokens per word: offer fewer words
+        window_words = window_words[:int(len(window_words) * 0.8)]
+        text_tokens = tokenizer.encode(" " + " ".join(window_words))
+    alignment = model.find_alignment(tokenizer, [text_tokens], encoder_output, content_frames)[0]
+
+    if len(alignment) != len(window_words):
+        return None
+    return [
+        (word, float(a["start"]), float(a["end"]), float(a["probability"]))
+        for word, a in zip(window_words, alignment)
+    ]
+
+
+def force_align(samples, target_text, language="en", model=None):
+    """
+    Walks the audio in ≤30s windows. Each window is offered the next chunk of
+    target words; words that end comfortably inside the window are accepted and
+    the next window starts at the last accepted word.
+    """
+    model = model or get_model()
+    tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual,
+                          task="transcribe", language=language)
+
+    features = model.feature_extractor(samples)
+    frames_per_sec = model.frames_per_second
+    total_frames = features.shape[-1]
+    window_sec = model.feature_extractor.nb_max_frames / frames_per_sec
+
+    target_words = normalize_text(target_text, lower=False).split()
+    max_window_words = math.ceil(window_sec * MAX_WORDS_PER_SEC)
+
+    aligned = []
+    cursor = 0
+    frame_start = 0
+    while cursor < len(target_words) and frame_start < total_frames:
+        offset = frame_start / frames_per_sec
+        remaining_sec = (total_frames - frame_start) / frames_per_sec
+        check_cancelled("alignment", remaining_sec)
+        is_last = remaining_sec <= window_sec
+
+        window_words = target_words[cursor:cursor + max_window_words]
+        result = _align_window(model, tokenizer, features, frame_start, window_words)
+        if result is None:
+            break
+
+        if is_last:
+            accepted = result
+        else:
+            # Alignment is monotonic, so the accepted words are a prefix
+            n = 0
+            while n < len(result) and result[n][2] <= window_sec - WINDOW_TAIL_MARGIN_SEC:
+                n += 1
+            accepted = result[:n]
+
+        if not accepted:
+            # Nothing finished in this window (long silence); slide forward
+            frame_start += int((window_sec - WINDOW_TAIL_MARGIN_SEC) * frames_per_sec)
+            continue
+
+        for word, start, end, prob in accepted:
+            aligned.append({
+                "word": word,
+                "original_word": word,
+                "start": round(offset + start, 3),
+                "end": round(offset + end, 3),
+                "confidence": round(prob, 4),
+            })
+        cursor += len(accepted)
+        frame_start = int(aligned[-1]["end"] * frames_per_sec)
+        emit("segment", start=aligned[-len(accepted)]["start"], end=aligned[-1]["end"],
+             text=" ".join(w[0] for w in accepted))
+
+    return aligned
+
+
+def find_low_confidence_spans(words, duration):
+    spans = [(w["start"], w["end"]) for w in words if w["confidence"] < MIN_WORD_PROBABILITY]
+
+    prev_end = 0.0
+    for w in words:
+        if w["start"] - prev_end > MAX_GAP_SEC:
+            spans.append((prev_end, w["start"]))
+        prev_end = w["end"]
+    if duration - prev_end > MAX_GAP_SEC:
+        spans.append((prev_end, duration))
+
+    return merge_spans(spans, duration)
+
+
+def transcribe_forced(audio_path, target_text, language="en", samples=None):
+    """
+    Forced-alignment variant of `transcribe_with_words`. Returns the same
+    {'text', 'words', 'language_probs'} structure plus an 'asr_stats' dict.
+    """
+    if samples is None:
+        samples = decode_audio(str(audio_path), sampling_rate=TARGET_SAMPLE_RATE)
+    duration = len(samples) / TARGET_SAMPLE_RATE
+
+    start = time.perf_counter()
+    with acquire_model() as model:
+        aligned = force_align(samples, target_text, language=language, model=model)
+    align_sec = time.perf_counter() - start
+
+    # Fall back to free decoding where the alignment is not trustworthy
+    start = time.perf_counter()
+    spans = find_low_confidence_spans(aligned, duration)
+    fallback_sec = sum(span[1] - span[0] for span in spans)
+    words = splice_words(aligned, decode_spans(audio_path, samples, spans, language))
+    decode_sec = time.perf_counter() - start
+
+    for w in words:
+        w.setdefault("duration", round(w["end"] - w["start"], 3))
+
+    stats = {
+        "aligned_words": len(aligned),
+        "fallback_spans": len(spans),
+        "fallback_sec": round(fallback_sec, 2),
+        "fallback_fraction": round(fallback_sec / duration, 3) if duration else 0.0,
+        "align_sec": round(align_sec, 3),
+        "fallback_decode_sec": round(decode_sec, 3),
+    }
+    logger.info(
+        f"🎯 Forced alignment: {len(aligned)} words in {stats['align_sec']}s, "
+        f"free-decoded {stats['fallback_fraction'] * 100:.1f}% of audio"
+    )
+
+    return {
+        "text": " ".join(w["original_word"] for w in words),
+        "words": words,
+        "language_probs": 1.0,
+        "asr_stats": stats,
+    }
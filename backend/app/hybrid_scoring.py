@@ -1,6 +1,9 @@
-from .transcribe import transcribe_with_words
-from .scoring import compute_text_score
+from .asr import transcribe, ASR_MODE
+from .scoring import compute_text_score, score_alignment
+from .scoring_utils import generate_analysis_report
 from .audio_scoring import compute_acoustic_clarity
+from .cancellation import check_cancelled
+from . import sessions
 
 # ---------------------------
 # Fluency Logic
@@ -43,37 +46,47 @@ def normalize_wpm_score(wpm):
     if wpm <= 20: return 20    # Struggling
     return (wpm / 110) * 100
 
+def composite_score(text_score, fluency_score, clarity_score):
+    # Weighting: 50% Accuracy, 30% Fluency, 20% Clarity
+    return (
+        0.50 * text_score +
+        0.30 * fluency_score +
+        0.20 * clarity_score
+    )
+
 # ---------------------------
 # MAIN PIPELINE
 # ---------------------------
 
-def compute_per_word_scores(target_text, lang_code, audio_path):
+def compute_per_word_scores(target_text, lang_code, audio_path, samples=None):
     """
     Full Assessment Pipeline.
+
+    `samples` is the already-decoded 16kHz mono float32 signal, when the
+    caller has it, so neither stage decodes the file again.
     """
     
     # 1. Transcribe (Speech -> Text + Time)
-    trans_result = transcribe_with_words(audio_path, language=lang_code)
+    trans_result = transcribe(audio_path, target_text, language=lang_code, samples=samples)
     words = trans_result["words"]
     rec_text = trans_result["text"]
     
+    check_cancelled("text_scoring")
+
     # 2. Text Scoring (Accuracy + Stutter Detection)
     text_result = compute_text_score(target_text, rec_text)
     
+    check_cancelled("acoustic_scoring")
+
     # 3. Acoustic Scoring (Clarity + Confidence)
-    acoustic_result = compute_acoustic_clarity(audio_path, words)
+    acoustic_result = compute_acoustic_clarity(audio_path, words, samples=samples)
     
     # 4. Fluency Scoring (Speed + Pauses)
     fluency_stats = compute_fluency_metrics(words)
     fluency_score = normalize_wpm_score(fluency_stats["wpm"])
     
     # 5. Final Composite Score
-    # Weighting: 50% Accuracy, 30% Fluency, 20% Clarity
-    final_score = (
-        0.50 * text_result["text_score"] +
-        0.30 * fluency_score +
-        0.20 * acoustic_result["clarity_score"]
-    )
+    final_score = composite_score(text_result["text_score"], fluency_score, acoustic_result["clarity_score"])
     
     return {
         "overall_score": round(final_score, 1),
@@ -93,5 +106,73 @@ def compute_per_word_scores(target_text, lang_code, audio_path):
         },
         
         "recognized_text": rec_text,
-        "word_alignment": text_result["word_alignment"]
-    }
\ No newline at end of file
+        "word_alignment": text_result["word_alignment"],
+        "asr_stats": {"mode": ASR_MODE, **trans_result.get("asr_stats", {})}
+    }
+
+def compute_reread_scores(session_id, sentence, audio_path, samples=None, duration_sec=0.0):
+    """
+    Partial re-read: scores a clip of one sentence of a stored session and
+    splices it into the session's alignment. Only the clip is transcribed;
+    the passage scores are recomputed from the merged alignment. Fluency is
+    the report's measure, blended by reading time across sentences, and is
+    what `overall_score` uses.
+
+    Same return structure as `compute_per_word_scores`, plus the passage's
+    `target_text`, `duration_sec` (reading time of the merged passage) and `reread`.
+    """
+    sentence_text, lang_code = sessions.reread_target(session_id, sentence)
+
+    # 1. Transcribe the clip against its sentence only
+    trans_result = transcribe(audio_path, sentence_text, language=lang_code, samples=samples)
+    words = trans_result["words"]
+    rec_text = trans_result["text"]
+
+    check_cancelled("text_scoring")
+    text_result = compute_text_score(sentence_text, rec_text)
+
+    check_cancelled("acoustic_scoring")
+    acoustic_result = compute_acoustic_clarity(audio_path, words, samples=samples)
+    fluency_stats = compute_fluency_metrics(words)
+    # Same fluency measure the full assessment reported (and the session stored)
+    clip_metrics, _ = generate_analysis_report(text_result["word_alignment"], sentence_text, duration_sec)
+    fluency_score = clip_metrics["fluency"]
+
+    # 2. Splice into the stored passage and re-score it (no ASR)
+    merged = sessions.splice(
+        session_id, sentence, text_result["word_alignment"],
+        duration_sec, fluency_score, acoustic_result["clarity_score"]
+    )
+    text_score, metrics = score_alignment(merged["alignment"], merged["total_tokens"])
+    text_score = round(text_score, 1)
+    final_score = composite_score(text_score, merged["fluency"], merged["clarity"])
+
+    return {
+        "overall_score": round(final_score, 1),
+
+        "components": {
+            "accuracy": text_score,
+            "fluency": round(merged["fluency"], 1),
+            "clarity": round(merged["clarity"], 1)
+        },
+
+        "detailed_metrics": {
+            "wpm": fluency_stats["wpm"],
+            "blocks": fluency_stats["blocks"],
+            "stutters": metrics["stutters"],
+            "correct_words": metrics["correct"],
+            "total_words_read": len(words)
+        },
+
+        "target_text": merged["target_text"],
+        "recognized_text": " ".join(item["recognized"] for item in merged["alignment"] if item["recognized"]),
+        "word_alignment": merged["alignment"],
+        "duration_sec": merged["duration_sec"],
+        "reread": {
+            "sentence": sentence,
+            "target_text": sentence_text,
+            "recognized_text": rec_text,
+            "accuracy": text_result["text_score"]
+        },
+        "asr_stats": {"mode": ASR_MODE, **trans_result.get("asr_stats", {})}
+    }
@@ -0,0 +1,107 @@
+"""
+Client side of the shared inference server (see `inference_server.py`).
+
+HTTP workers keep a small pool of connections to the server. Audio is
+handed over in a shared-memory block; only the small request/response
+dicts go through the socket.
+"""
+
+import os
+import queue
+from multiprocessing.connection import Client
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from .audio_io import open_pcm16_wav, pcm16_to_float32, TARGET_SAMPLE_RATE
+
+# "host:port" for TCP, anything else is a unix socket path. Unset = in-process model.
+INFERENCE_ADDRESS = os.getenv("PRONOUNCE_INFERENCE_ADDRESS")
+# Messages are pickled, so whoever can connect can run code in the server:
+# TCP requires a shared secret; unix sockets rely on file permissions (owner only).
+AUTHKEY = os.getenv("PRONOUNCE_INFERENCE_AUTHKEY", "").encode() or None
+
+_connections = queue.LifoQueue()
+
+
+def parse_address(address: str):
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        if AUTHKEY is None:
+            raise RuntimeError("A TCP inference address needs PRONOUNCE_INFERENCE_AUTHKEY")
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def _connect(address):
+    return Client(parse_address(address or INFERENCE_ADDRESS), authkey=AUTHKEY)
+
+
+def _load_samples(audio_path):
+    pcm = open_pcm16_wav(audio_path)
+    if pcm is not None:
+        return pcm16_to_float32(pcm)
+
+    from faster_whisper.audio import decode_audio
+    return decode_audio(str(audio_path), sampling_rate=TARGET_SAMPLE_RATE)
+
+
+def request(message: dict, samples=None, address: str = None):
+    """
+    Sends one request to the inference server and returns its result.
+    `samples` (float32) are copied once into shared memory for the server to map.
+    """
+    shm = None
+    if samples is not None:
+        shm = SharedMemory(create=True, size=max(samples.nbytes, 1))
+        shared = np.ndarray(samples.shape, dtype=np.float32, buffer=shm.buf)
+        shared[:] = samples
+        del shared
+        message = {**message, "shm": shm.name, "n_samples": len(samples)}
+
+    try:
+        try:
+            conn, pooled = _connections.get_nowait(), True
+        except queue.Empty:
+            conn, pooled = _connect(address), False
+
+        try:
+            conn.send(message)
+            reply = conn.recv()
+        except (EOFError, ConnectionError):
+            conn.close()
+            if not pooled:
+                raise
+            # Pooled connection went stale (server restarted): retry once on a fresh one
+            conn = _connect(address)
+            try:
+                conn.send(message)
+                reply = conn.recv()
+            except (EOFError, OSError):
+                conn.close()
+                raise
+        except OSError:
+            conn.close()
+            raise
+        _connections.put(conn)
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    if "error" in reply:
+        raise RuntimeError(f"Inference server error: {reply['error']}")
+    return reply["result"]
+
+
+def transcribe_remote(audio_path, target_text, language="en", samples=None, mode=None):
+    """Same contract as `asr.transcribe_local`, executed by the inference server."""
+    if samples is None:
+        samples = _load_samples(audio_path)
+
+    return request({
+        "op": "transcribe",
+        "target_text": target_text,
+        "language": language,
+        "mode": mode,
+    }, samples=samples)
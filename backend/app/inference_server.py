@@ -0,0 +1,186 @@
+"""
+Shared inference server.
+
+One process owns the Whisper model(s); any number of uvicorn workers send it
+audio through shared memory (see `inference_client.py`) and get the usual
+{'text', 'words', 'language_probs'} result back. HTTP handling and audio
+decoding then scale with `--workers N` while model memory stays at one copy.
+
+Usage:
+    python -m backend.app.inference_server --address /tmp/pronounce-infer.sock
+    PRONOUNCE_INFERENCE_ADDRESS=/tmp/pronounce-infer.sock \
+        uvicorn backend.app.main:app --workers 4
+
+A TCP address (host:port) is refused unless PRONOUNCE_INFERENCE_AUTHKEY is set
+(same value for server and workers): requests are pickled, so an unauthenticated
+port would run code for anyone who can reach it.
+"""
+
+import argparse
+import logging
+import os
+import threading
+import time
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Listener
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from . import asr
+from . import model_swap
+from .cascade import DRAFT_MODEL, MULTILINGUAL_DRAFT_MODEL
+from .audio_io import TARGET_SAMPLE_RATE
+from .inference_client import AUTHKEY, INFERENCE_ADDRESS, parse_address
+from .model_loader import MODEL_REPLICAS, SETTINGS, get_model, get_pool_stats
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s [%(levelname)s] %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+DEFAULT_ADDRESS = "/tmp/pronounce-infer.sock"
+
+# CTranslate2 runs at most `num_workers` transcriptions per replica in parallel
+# anyway; gating here keeps queued requests from holding decoded audio in the model.
+_slots = threading.BoundedSemaphore(max(1, SETTINGS["num_workers"]) * MODEL_REPLICAS)
+
+_stats_lock = threading.Lock()
+_stats = {
+    "started_at": time.time(),
+    "connections": 0,
+    "requests": 0,
+    "errors": 0,
+    "in_flight": 0,
+    "audio_sec": 0.0,
+    "busy_sec": 0.0,
+}
+
+
+def _attach(name):
+    """Maps a client's shared-memory block without taking ownership of it."""
+    try:
+        return SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = SharedMemory(name=name)
+        # Older Pythons register every attach; the client unlinks, not us
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _transcribe(message):
+    shm = _attach(message["shm"])
+    try:
+        samples = np.ndarray((message["n_samples"],), dtype=np.float32, buffer=shm.buf)
+        with _slots:
+            with _stats_lock:
+                _stats["in_flight"] += 1
+            start = time.perf_counter()
+            try:
+                result = asr.transcribe_local(
+                    None, message["target_text"], language=message["language"],
+                    samples=samples, mode=message.get("mode")
+                )
+            finally:
+                elapsed = time.perf_counter() - start
+                with _stats_lock:
+                    _stats["in_flight"] -= 1
+                    _stats["busy_sec"] += elapsed
+                    _stats["audio_sec"] += len(samples) / TARGET_SAMPLE_RATE
+        del samples
+        return result
+    finally:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # a view is still alive (error path); freed with the traceback
+
+
+def _handle(message):
+    op = message.get("op")
+    if op == "transcribe":
+        return _transcribe(message)
+    if op == "stats":
+        with _stats_lock:
+            stats = dict(_stats)
+        stats["uptime_sec"] = round(time.time() - stats.pop("started_at"), 1)
+        stats["model"] = SETTINGS["model_size"]
+        stats["pid"] = os.getpid()
+        stats["models"] = get_pool_stats()
+        return stats
+    if op == "ping":
+        return "pong"
+    if op.startswith("model_") and op[len("model_"):] in model_swap.ADMIN_OPS:
+        # Hot swap / A/B admin, forwarded by the HTTP workers
+        return model_swap.ADMIN_OPS[op[len("model_"):]](**message.get("params", {}))
+    raise ValueError(f"Unknown op: {op}")
+
+
+def _serve_connection(conn):
+    with _stats_lock:
+        _stats["connections"] += 1
+    try:
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                break
+
+            with _stats_lock:
+                _stats["requests"] += 1
+            try:
+                reply = {"result": _handle(message)}
+            except Exception as e:
+                logger.error(f"🔥 Inference error: {e}")
+                with _stats_lock:
+                    _stats["errors"] += 1
+                reply = {"error": str(e)}
+            conn.send(reply)
+    finally:
+        conn.close()
+        with _stats_lock:
+            _stats["connections"] -= 1
+
+
+def serve(address):
+    address = parse_address(address)
+    if isinstance(address, str) and os.path.exists(address):
+        os.remove(address)  # stale socket from a previous run
+
+    # Load (and keep) the models before accepting work
+    if asr.ASR_MODE != "stub":
+        get_model()
+    if asr.ASR_MODE == "cascade":
+        get_model(DRAFT_MODEL)
+        if MULTILINGUAL_DRAFT_MODEL:
+            get_model(MULTILINGUAL_DRAFT_MODEL)
+
+    # Unix socket file is owner-only from the moment it exists (no key on it by default)
+    old_umask = os.umask(0o177)
+    try:
+        listener = Listener(address, authkey=AUTHKEY)
+    finally:
+        os.umask(old_umask)
+
+    with listener:
+        logger.info(f"🧠 Inference server ready on {address} (pid {os.getpid()}, mode {asr.ASR_MODE})")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                logger.warning(f"⚠️  Rejected connection: {e}")
+                continue
+            threading.Thread(target=_serve_connection, args=(conn,), daemon=True).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared Whisper inference server.")
+    parser.add_argument("--address", default=INFERENCE_ADDRESS or DEFAULT_ADDRESS,
+                        help="unix socket path or host:port")
+    args = parser.parse_args()
+    serve(args.address)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,50 @@
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Request, Header, Query
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
+from pydantic import BaseModel
 from pydub import AudioSegment
 import os
 import time
-import shutil
 import random
 import logging
+import uuid
+import asyncio
+import numpy as np
 
 # --- INTERNAL IMPORTS ---
 # 1. The Core Scoring Engine
-from backend.app.hybrid_scoring import compute_per_word_scores
+from backend.app.hybrid_scoring import compute_per_word_scores, compute_reread_scores
 # 2. The New Modular Utility for Error Analysis
 from backend.app.scoring_utils import generate_analysis_report
+# 3. Columnar Analytics Store
+from backend.app import analytics
+# 4. Zero-copy WAV reader
+from backend.app.audio_io import open_pcm16_wav, pcm16_to_float32, TARGET_SAMPLE_RATE
+# 5. Per-request cancellation (client disconnect / deadline)
+from backend.app import cancellation
+from backend.app.cancellation import CancellationToken, RequestCancelled, check_cancelled
+# 6. Upload/duration/memory caps and per-request memory accounting
+from backend.app import memory_guard
+from backend.app.memory_guard import MemoryLedger, LimitExceeded
+# 7. On-demand per-request profiling
+from backend.app import profiling
+# 8. Fast JSON / MessagePack encoding and response field selection
+from backend.app import serialization
+# 9. Model replica pool and artifact store stats
+from backend.app.model_loader import get_pool_stats
+from backend.app import model_store
+# 10. Model hot swap / A/B routing (lives in the inference server when one is used)
+from backend.app import model_swap
+from backend.app import inference_client
+# 11. Progress events for the streaming endpoint
+from backend.app import progress
+# 12. Stored alignments for partial (single-sentence) re-reads
+from backend.app import sessions
+# 13. Repetition / restart detection counters
+from backend.app import repetition
 
 # --------------------
 # LOGGING SETUP
@@ -59,6 +90,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    """413 on the declared Content-Length, before Starlette reads the body."""
+    if request.method == "POST" and request.url.path.startswith("/process-audio"):
+        try:
+            memory_guard.check_content_length(request.headers.get("content-length"))
+        except LimitExceeded as e:
+            memory_guard.record_rejection(e)
+            logger.warning(f"🚫 {e.detail}")
+            return JSONResponse(status_code=e.status_code, content={"detail": e.detail})
+    return await call_next(request)
+
 # --------------------
 # Paths
 # --------------------
@@ -97,7 +140,7 @@ PASSAGE_BANK = {
 # --------------------
 
 def detect_and_rename(filepath: Path) -> Path:
-    """Checks header bytes to determine real extension (WebM vs WAV)."""
+    """Checks header bytes to determine real extension (WebM vs WAV vs FLAC)."""
     with open(filepath, "rb") as f:
         header = f.read(4)
 
@@ -110,6 +153,10 @@ def detect_and_rename(filepath: Path) -> Path:
         if filepath.suffix != ".wav":
             new_path = filepath.with_suffix(".wav")
             os.rename(filepath, new_path)
+    elif header.startswith(b'fLaC'):  # FLAC (downsampled frontend uploads)
+        if filepath.suffix != ".flac":
+            new_path = filepath.with_suffix(".flac")
+            os.rename(filepath, new_path)
     
     return new_path
 
@@ -117,22 +164,180 @@ def detect_and_rename(filepath: Path) -> Path:
 # API ENDPOINTS
 # --------------------
 
+DISCONNECT_POLL_SEC = 0.5
+
+async def watch_disconnect(request: Request, token: CancellationToken):
+    """Fires the token as soon as the client goes away."""
+    while not token.cancelled:
+        if await request.is_disconnected():
+            token.cancel("client_disconnected")
+            return
+        await asyncio.sleep(DISCONNECT_POLL_SEC)
+
 @app.post("/process-audio/")
-def process_audio(
+async def process_audio(
+    request: Request,
+    file: UploadFile = File(...),
+    target_text: str = Form(...),
+    language: str = Form("en"),
+    fields: str = Query(None),
+    accept: str = Header(None),
+    x_profile: str = Header(None),
+    x_admin_token: str = Header(None)
+):
+    # Validate the response shape before doing any work
+    selected = serialization.parse_fields(fields)
+    fmt = serialization.negotiate(accept)
+
+    token = CancellationToken()
+    profile_mode = profiling.choose_mode(x_profile, x_admin_token)
+    watcher = asyncio.create_task(watch_disconnect(request, token))
+    try:
+        payload = await run_in_threadpool(
+            run_assessment, file, target_text, language, token, profile_mode, selected
+        )
+    finally:
+        watcher.cancel()
+    return serialization.encode_response(payload, fmt)
+
+SSE_KEEPALIVE_SEC = 15
+
+def sse_message(event: str, data) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + serialization.dumps_json(data) + b"\n\n"
+
+@app.post("/process-audio/stream")
+async def process_audio_stream(
     file: UploadFile = File(...),
     target_text: str = Form(...),
-    language: str = Form("en")
+    language: str = Form("en"),
+    fields: str = Query(None),
+    x_profile: str = Header(None),
+    x_admin_token: str = Header(None)
 ):
-    # 1. Attach Memory Logger
-    memory_handler = InMemoryHandler()
-    formatter = logging.Formatter('%(message)s')
-    memory_handler.setFormatter(formatter)
+    """
+    Same pipeline as /process-audio/, reported as server-sent events:
+    received -> decoded -> segment (partial text, one per decoded segment)
+    -> scored -> result (the usual response body), or error.
+    Closing the connection cancels the request.
+    """
+    selected = serialization.parse_fields(fields)
+    token = CancellationToken()
+    profile_mode = profiling.choose_mode(x_profile, x_admin_token)
+
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+
+    def sink(event, data):
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+
+    async def run():
+        try:
+            payload = await run_in_threadpool(
+                run_assessment, file, target_text, language, token, profile_mode, selected, sink
+            )
+            sink("result", payload)
+        except HTTPException as e:
+            sink("error", {"status": e.status_code, "detail": e.detail})
+        finally:
+            sink(None, None)
+
+    async def stream():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                try:
+                    event, data = await asyncio.wait_for(events.get(), SSE_KEEPALIVE_SEC)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+                if event is None:
+                    break
+                yield sse_message(event, data)
+        finally:
+            # Client went away mid-stream: stop the pipeline at its next checkpoint
+            if not task.done():
+                token.cancel("client_disconnected")
+
+    return StreamingResponse(
+        stream(), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/process-audio/reread")
+async def process_reread(
+    request: Request,
+    file: UploadFile = File(...),
+    session_id: str = Form(...),
+    sentence: int = Form(...),
+    fields: str = Query(None),
+    accept: str = Header(None),
+    x_profile: str = Header(None),
+    x_admin_token: str = Header(None)
+):
+    """
+    Re-scores one sentence of an earlier /process-audio/ result. `file` holds
+    only the re-read sentence (index into GET /sessions/{session_id}); the
+    response is the whole passage with that sentence replaced.
+    """
+    selected = serialization.parse_fields(fields)
+    fmt = serialization.negotiate(accept)
+    try:
+        sentence_text, language = sessions.reread_target(session_id, sentence)
+    except sessions.SessionError as e:
+        raise HTTPException(e.status_code, e.detail)
+
+    token = CancellationToken()
+    profile_mode = profiling.choose_mode(x_profile, x_admin_token)
+    watcher = asyncio.create_task(watch_disconnect(request, token))
+    try:
+        payload = await run_in_threadpool(
+            run_assessment, file, sentence_text, language, token, profile_mode, selected,
+            None, (session_id, sentence)
+        )
+    finally:
+        watcher.cancel()
+    return serialization.encode_response(payload, fmt)
+
+@app.get("/sessions/{session_id}")
+def get_session(session_id: str):
+    """Sentences of a stored assessment, as indexed by /process-audio/reread."""
+    try:
+        return sessions.describe(session_id)
+    except sessions.SessionError as e:
+        raise HTTPException(e.status_code, e.detail)
+
+def run_assessment(
+    file: UploadFile, target_text: str, language: str, token: CancellationToken,
+    profile_mode: str = None, fields: set = None, progress_sink=None, reread=None
+):
+    """
+    The scoring pipeline (runs in a worker thread).
+    `reread` = (session_id, sentence index): `file` is a re-read of that
+    sentence only (`target_text`) and the result is the merged session.
+    """
+    cancellation.activate(token)
+    progress.activate(progress_sink)
+    fields = fields or serialization.FIELD_PRESETS["full"]
+
+    # 1. Attach Memory Logger (only if the client wants the logs back)
+    memory_handler = None
     root_logger = logging.getLogger()
-    root_logger.addHandler(memory_handler)
+    if "logs" in fields:
+        memory_handler = InMemoryHandler()
+        formatter = logging.Formatter('%(message)s')
+        memory_handler.setFormatter(formatter)
+        root_logger.addHandler(memory_handler)
     
     start_time = time.time()
+    request_id = uuid.uuid4().hex
+    session_id = reread[0] if reread else request_id
     raw_path = None
     clean_path = None
+    pcm = None
+    duration_sec = 0.0
+    ledger = MemoryLedger()
+    # Frames are grouped under the ledger's current stage
+    profile = profiling.start(profile_mode, stage_source=lambda: ledger.stage)
 
     try:
         logger.info(f"🚀 Request received. File: {file.filename}")
@@ -140,47 +345,108 @@ def process_audio(
         iso_lang = LANG_MAP.get(language.lower().strip(), "en")
         logger.info(f"ℹ️  Language set to: {iso_lang}")
 
-        # Save Raw
-        raw_filename = f"raw_{int(time.time())}_{file.filename}"
+        # Save Raw (streamed, size-capped)
+        ledger.enter("upload")
+        raw_filename = f"raw_{request_id}_{file.filename}"
         raw_path = UPLOAD_DIR / raw_filename
-        with open(raw_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        upload_bytes = memory_guard.copy_upload(file.file, raw_path, ledger)
+        progress.emit("received", filename=file.filename, bytes=upload_bytes)
         
         # Format Check
         raw_path = detect_and_rename(raw_path)
+        check_cancelled("decode")
         
         # Audio Processing
-        logger.info("🔊 Decoding audio stream...")
-        audio = AudioSegment.from_file(str(raw_path))
-        
-        duration_sec = audio.duration_seconds
+        ledger.enter("decode")
+        # Fast path: upload is already 16kHz mono 16-bit PCM WAV -> memory-map it
+        if raw_path.suffix == ".wav":
+            pcm = open_pcm16_wav(raw_path)
+
+        if pcm is not None:
+            logger.info("⚡ 16kHz mono PCM WAV detected, skipping transcode.")
+            audio = None
+            duration_sec = len(pcm) / TARGET_SAMPLE_RATE
+            memory_guard.check_duration(duration_sec)
+            memory_guard.check_projected(duration_sec)
+            ledger.hold("pcm", pcm.nbytes)
+            is_silent = not np.any(pcm)
+        else:
+            # Enforce caps from the header before decoding, where the container allows it
+            header = memory_guard.probe(raw_path)
+            if header is not None:
+                memory_guard.check_duration(header[0])
+                memory_guard.check_projected(*header)
+
+            logger.info("🔊 Decoding audio stream...")
+            # Never decode more than the cap (+1s to detect overruns) for header-less streams
+            audio = AudioSegment.from_file(str(raw_path), duration=memory_guard.MAX_AUDIO_SEC + 1)
+            ledger.hold("decoded", len(audio.raw_data))
+            duration_sec = audio.duration_seconds
+            memory_guard.check_duration(duration_sec)
+            memory_guard.check_projected(duration_sec, audio.frame_rate, audio.channels)
+            is_silent = audio.max_dBFS == -float("inf")
+
         logger.info(f"⏱️  Audio Duration: {round(duration_sec, 2)}s")
 
-        if audio.max_dBFS == -float("inf"):
+        if is_silent:
             raise HTTPException(400, "Silent audio detected")
         if duration_sec < 0.5:
             raise HTTPException(400, "Audio too short (< 0.5s)")
+        progress.emit("decoded", duration_sec=round(duration_sec, 2), fast_path=pcm is not None)
 
-        # Convert to 16kHz Mono WAV
-        logger.info("🛠️  Transcoding to 16kHz Mono WAV...")
-        clean_filename = f"clean_{int(time.time())}.wav"
-        clean_path = UPLOAD_DIR / clean_filename
-        
-        audio = audio.set_frame_rate(16000).set_channels(1).set_sample_width(2)
-        audio.export(clean_path, format="wav")
+        ledger.enter("resample")
+        if pcm is not None:
+            audio_path = raw_path
+            samples = pcm16_to_float32(pcm)
+        else:
+            # Convert to 16kHz Mono WAV
+            logger.info("🛠️  Transcoding to 16kHz Mono WAV...")
+            clean_filename = f"clean_{request_id}.wav"
+            clean_path = UPLOAD_DIR / clean_filename
+            
+            audio = audio.set_frame_rate(TARGET_SAMPLE_RATE).set_channels(1).set_sample_width(2)
+            ledger.release("decoded")
+            ledger.hold("resampled", len(audio.raw_data))
+            audio.export(clean_path, format="wav")
+            audio_path = clean_path
+
+            # Hand the decoded signal to the scorer so neither Whisper nor librosa decodes it again
+            samples = pcm16_to_float32(np.frombuffer(audio.raw_data, dtype=np.int16))
+            audio = None
+            ledger.release("resampled")
+        ledger.hold("samples", samples.nbytes)
 
         # Call Scoring Engine
+        check_cancelled("transcription", duration_sec)
+        ledger.enter("scoring")
+        ledger.hold("whisper", duration_sec * memory_guard.WHISPER_BYTES_PER_SEC, estimated=True)
         logger.info("🧠 Invoking Hybrid Scoring Engine...")
-        result = compute_per_word_scores(
-            target_text=target_text,
-            lang_code=iso_lang,
-            audio_path=str(clean_path)
-        )
+        if reread is None:
+            result = compute_per_word_scores(
+                target_text=target_text,
+                lang_code=iso_lang,
+                audio_path=str(audio_path),
+                samples=samples
+            )
+        else:
+            logger.info(f"✂️  Partial re-read of sentence {reread[1]} (session {session_id})")
+            result = compute_reread_scores(
+                session_id, reread[1],
+                audio_path=str(audio_path),
+                samples=samples,
+                duration_sec=duration_sec
+            )
+            # The report covers the whole merged passage
+            target_text = result["target_text"]
+            duration_sec = result["duration_sec"]
         logger.info("✨ Scoring calculation complete.")
+        ledger.release("whisper")
 
         # ----------------------------------------
         # MODULAR ANALYSIS & METRICS
         # ----------------------------------------
+        check_cancelled("report")
+        ledger.enter("report")
         logger.info("📊 Generating Detailed Error Analysis...")
         
         # We use the separate utility function here to keep main.py clean
@@ -196,7 +462,39 @@ def process_audio(
         if "accuracy" in metrics:
             result["components"]["accuracy"] = metrics["accuracy"]
         if "fluency" in metrics:
-            result["components"]["fluency"] = metrics["fluency"]
+            if reread is None:
+                result["components"]["fluency"] = metrics["fluency"]
+            else:
+                # Re-read: reading-time blend of the sentences' reported fluency (also behind overall_score)
+                metrics["fluency"] = result["components"]["fluency"]
+
+        if reread is None:
+            # Keep the alignment (and the components as reported) so single sentences can be re-read later
+            sessions.save(session_id, target_text, iso_lang, result, duration_sec)
+
+        # After the report, so the event carries the components the response will have
+        progress.emit(
+            "scored",
+            recognized_text=result.get("recognized_text", ""),
+            overall_score=result.get("overall_score", 0),
+            components=result.get("components", {})
+        )
+
+        # Analytics must never fail a scoring request
+        # (re-reads are corrections of a recorded assessment, not new ones)
+        try:
+            if reread is None:
+                analytics.record_assessment(
+                    session_id=session_id,
+                    language=iso_lang,
+                    alignment=result.get("word_alignment", []),
+                    metrics=metrics,
+                    error_report=error_report,
+                    duration_sec=duration_sec,
+                    overall_score=result.get("overall_score", 0)
+                )
+        except Exception as e:
+            logger.warning(f"⚠️  Analytics recording failed: {e}")
         
         # ----------------------------------------
         # RESPONSE
@@ -204,11 +502,23 @@ def process_audio(
         latency = round(time.time() - start_time, 2)
         logger.info(f"🏁 Process finished in {latency}s")
 
-        return {
-            "meta": {
-                "latency_sec": latency,
-                "language": iso_lang,
-            },
+        memory_guard.record(ledger)
+        meta = {
+            "session_id": session_id,
+            "latency_sec": latency,
+            "language": iso_lang,
+            "asr": result.get("asr_stats", {}),
+        }
+        if memory_guard.MEMORY_IN_META:
+            meta["memory"] = ledger.report()
+        if profile is not None:
+            meta["profile"] = profile.mode
+        if reread is not None:
+            meta["request_id"] = request_id
+            meta["reread"] = result["reread"]
+
+        response = {
+            "meta": meta,
             "target_text": target_text,
             "recognized_text": result.get("recognized_text", ""),
             "overall_score": result.get("overall_score", 0),
@@ -220,8 +530,30 @@ def process_audio(
             "error_analysis": error_report,
             
             # This allows the frontend to show the terminal logs
-            "logs": memory_handler.log_records
+            "logs": memory_handler.log_records if memory_handler else []
         }
+        return {k: v for k, v in response.items() if k in fields}
+
+    except RequestCancelled as e:
+        cancellation.record_cancellation(e)
+        logger.warning(f"🛑 {e}")
+        if e.reason == "deadline_exceeded":
+            raise HTTPException(504, f"Processing deadline exceeded during {e.stage}")
+        # Client is gone; nobody reads this (499 = client closed request)
+        raise HTTPException(499, "Client disconnected")
+
+    except LimitExceeded as e:
+        memory_guard.record_rejection(e)
+        logger.warning(f"🚫 {e.detail}")
+        raise HTTPException(e.status_code, e.detail)
+
+    except sessions.SessionError as e:
+        # Session expired while the re-read was being transcribed
+        logger.warning(f"🚫 {e.detail}")
+        raise HTTPException(e.status_code, e.detail)
+
+    except HTTPException:
+        raise
 
     except Exception as e:
         logger.error(f"🔥 Critical Error: {str(e)}")
@@ -230,6 +562,16 @@ def process_audio(
         raise HTTPException(500, f"Processing Error: {str(e)}")
 
     finally:
+        # Release the memmap before deleting the file it maps (required on Windows)
+        pcm = None
+
+        if profile is not None:
+            try:
+                path = profile.finish(request_id)
+                logger.info(f"🔬 Profile saved: {path.name}")
+            except Exception as e:
+                logger.warning(f"⚠️  Profile could not be saved: {e}")
+
         # Cleanup
         for p in [raw_path, clean_path]:
             if p and p.exists():
@@ -237,7 +579,8 @@ def process_audio(
                 except: pass
         
         # Detach Logger
-        root_logger.removeHandler(memory_handler)
+        if memory_handler is not None:
+            root_logger.removeHandler(memory_handler)
         
 @app.get("/get-passage/")
 def get_passage(language: str = "en"):
@@ -250,4 +593,107 @@ def get_passage(language: str = "en"):
         "language": iso_lang,
         "passage_id": pid,
         "passage": passage
-    }
\ No newline at end of file
+    }
+
+@app.get("/analytics/{query}")
+def get_analytics(
+    query: str,
+    language: str = None,
+    since: str = None,
+    until: str = None,
+    limit: int = Query(None, ge=1),
+    bins: int = Query(None, ge=1)
+):
+    """Aggregate queries over the columnar assessment history."""
+    if language:
+        language = LANG_MAP.get(language.lower().strip(), language)
+
+    params = {"language": language, "since": since, "until": until}
+    if query == "common-errors":
+        params["limit"] = limit
+    if query == "wpm-distribution":
+        params["bins"] = bins
+
+    try:
+        return {"query": query, "result": analytics.run_query(query, **params)}
+    except KeyError:
+        raise HTTPException(404, f"Unknown analytics query: {query}")
+
+@app.get("/metrics")
+def get_metrics():
+    """Process-level counters for operators."""
+    return {
+        "process": {"pid": os.getpid(), "rss_bytes": memory_guard.current_rss_bytes()},
+        "cancellation": cancellation.get_stats(),
+        "memory": memory_guard.get_stats(),
+        "models": get_pool_stats(),
+        "model_store": model_store.get_stats(),
+        "sessions": sessions.get_stats(),
+        "repetition": repetition.get_stats(),
+    }
+
+@app.get("/profiles/")
+def get_profiles(x_admin_token: str = Header(None)):
+    """Stored request profiles, newest first (admin only)."""
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(403, "Admin token required")
+    return {"profiles": profiling.list_profiles()}
+
+@app.get("/profiles/{request_id}")
+def get_profile(request_id: str, x_admin_token: str = Header(None)):
+    """
+    Downloads a request's profile: collapsed stacks (.folded, open in
+    speedscope.app or flamegraph.pl) or cProfile stats (.prof, open in snakeviz).
+    """
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(403, "Admin token required")
+    path = profiling.find_profile(request_id)
+    if path is None:
+        raise HTTPException(404, f"No profile for request {request_id}")
+    return FileResponse(path, media_type=profiling.FORMATS[path.suffix.lstrip(".")], filename=path.name)
+
+class ModelSwapRequest(BaseModel):
+    model_config = {"protected_namespaces": ()}
+
+    model_size: str = None
+    compute_type: str = None
+    cpu_threads: int = None
+    num_workers: int = None
+    beam_size: int = None
+    ab_percent: float = 0.0
+
+def model_admin(op: str, x_admin_token: str, **params):
+    if not profiling.is_admin(x_admin_token):
+        raise HTTPException(403, "Admin token required")
+    try:
+        if inference_client.INFERENCE_ADDRESS:
+            return inference_client.request({"op": f"model_{op}", "params": params})
+        return model_swap.ADMIN_OPS[op](**params)
+    except (model_swap.SwapError, RuntimeError) as e:
+        raise HTTPException(409, str(e))
+
+@app.get("/admin/model")
+def get_model_state(x_admin_token: str = Header(None)):
+    """Active / candidate model, swap status and per-deployment ASR latency."""
+    return model_admin("state", x_admin_token)
+
+@app.post("/admin/model", status_code=202)
+def swap_model(body: ModelSwapRequest, x_admin_token: str = Header(None)):
+    """
+    Loads and warms a new model configuration in the background, then either
+    switches new requests to it (ab_percent = 0) or routes ab_percent of them to it.
+    """
+    settings = {k: v for k, v in body.model_dump().items() if v is not None and k != "ab_percent"}
+    return model_admin("swap", x_admin_token, settings=settings, ab_percent=body.ab_percent)
+
+@app.post("/admin/model/promote")
+def promote_model(x_admin_token: str = Header(None)):
+    return model_admin("promote", x_admin_token)
+
+@app.post("/admin/model/rollback")
+def rollback_model(x_admin_token: str = Header(None)):
+    return model_admin("rollback", x_admin_token)
+
+@app.on_event("shutdown")
+def flush_analytics():
+    analytics.flush()
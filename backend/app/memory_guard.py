@@ -0,0 +1,221 @@
+"""
+Memory-bounded audio processing.
+
+- Caps on upload size, audio duration and projected per-request memory,
+  enforced before the expensive stages (decode, resample, transcription).
+- A per-request MemoryLedger that accounts the audio buffers each stage
+  holds and records the peak per stage. Buffer sizes are exact except for
+  the entries listed under `estimated_bytes` (the in-memory part of the
+  upload, Whisper's working set); next to them each stage's measured
+  worker RSS change is reported.
+- Process-wide counters for /metrics.
+"""
+
+import os
+import threading
+
+import soundfile as sf
+
+from .audio_io import TARGET_SAMPLE_RATE
+
+MAX_UPLOAD_BYTES = int(os.getenv("PRONOUNCE_MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+MAX_AUDIO_SEC = float(os.getenv("PRONOUNCE_MAX_AUDIO_SEC", "600"))
+MAX_REQUEST_MEMORY_BYTES = int(os.getenv("PRONOUNCE_MAX_REQUEST_MEMORY_BYTES", str(512 * 1024 * 1024)))
+MEMORY_IN_META = os.getenv("PRONOUNCE_MEMORY_IN_META", "0") == "1"
+
+UPLOAD_SPOOL_BYTES = 1024 * 1024
+# Multipart framing and form fields on top of the file in Content-Length
+FORM_OVERHEAD_BYTES = 64 * 1024
+
+# Whisper's own working set per second of audio beyond the float32 input
+# (log-mel features + encoder chunking); conservative estimate.
+WHISPER_BYTES_PER_SEC = 64 * 1024
+
+_stats_lock = threading.Lock()
+_stats = {
+    "requests": 0,
+    "rejected": {},
+    "max_peak_bytes": 0,
+    "stage_peak_sum": {},
+    "stage_rss_delta_sum": {},
+    "estimated": set(),
+}
+
+
+class LimitExceeded(Exception):
+    def __init__(self, status_code, detail, reason):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.reason = reason
+
+
+def current_rss_bytes():
+    """Resident set size of this worker (Linux /proc; None elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class MemoryLedger:
+    """
+    Tracks the audio buffers a request holds, per stage. `estimated=True`
+    marks a hold whose size is an estimate rather than a buffer's length.
+    Per stage it also measures the worker's RSS change (which includes
+    concurrent requests and memory the allocator keeps).
+    """
+
+    def __init__(self):
+        self.live = {}
+        self.current = 0
+        self.peak = 0
+        self.stage_peaks = {}
+        self.stage = None
+        self.estimates = {}
+        self.stage_rss_deltas = {}
+        self._stage_rss = None
+
+    def _close_stage(self):
+        rss = current_rss_bytes()
+        if self.stage is not None and rss is not None and self._stage_rss is not None:
+            self.stage_rss_deltas[self.stage] = self.stage_rss_deltas.get(self.stage, 0) + rss - self._stage_rss
+        return rss
+
+    def enter(self, stage):
+        self._stage_rss = self._close_stage()
+        self.stage = stage
+        self.stage_peaks.setdefault(stage, self.current)
+
+    def finish(self):
+        """Closes the last stage's RSS measurement."""
+        self._close_stage()
+        self.stage = None
+
+    def hold(self, name, nbytes, estimated=False):
+        self.release(name)
+        if estimated:
+            self.estimates[name] = int(nbytes)
+        self.live[name] = int(nbytes)
+        self.current += int(nbytes)
+        self.peak = max(self.peak, self.current)
+        if self.stage is not None:
+            self.stage_peaks[self.stage] = max(self.stage_peaks.get(self.stage, 0), self.current)
+
+    def release(self, name):
+        self.current -= self.live.pop(name, 0)
+
+    def report(self):
+        return {
+            "peak_bytes": self.peak,
+            "stage_peak_bytes": dict(self.stage_peaks),
+            "estimated_bytes": dict(self.estimates),
+            "stage_rss_delta_bytes": dict(self.stage_rss_deltas),
+        }
+
+
+def check_content_length(header):
+    """Rejects (413) an upload whose declared size is already over the cap, before it is read."""
+    try:
+        declared = int(header)
+    except (TypeError, ValueError):
+        return
+    if declared > MAX_UPLOAD_BYTES + FORM_OVERHEAD_BYTES:
+        raise LimitExceeded(
+            413, f"Upload too large (> {MAX_UPLOAD_BYTES / (1024 * 1024):.1f} MB)", "upload_bytes"
+        )
+
+
+def copy_upload(src, dst_path, ledger):
+    """Streams the upload to disk, rejecting it (413) once it exceeds MAX_UPLOAD_BYTES."""
+    written = 0
+    with open(dst_path, "wb") as dst:
+        while True:
+            chunk = src.read(1024 * 1024)
+            if not chunk:
+                break
+            written += len(chunk)
+            if written > MAX_UPLOAD_BYTES:
+                raise LimitExceeded(
+                    413, f"Upload too large (> {MAX_UPLOAD_BYTES / (1024 * 1024):.1f} MB)", "upload_bytes"
+                )
+            dst.write(chunk)
+    # Starlette spools uploads to disk past 1 MB; only that much stays in memory
+    ledger.hold("upload", min(written, UPLOAD_SPOOL_BYTES), estimated=True)
+    return written
+
+
+def probe(path):
+    """
+    (duration_sec, sample_rate, channels) from the container header, without
+    decoding. Returns None for formats libsndfile can't read (e.g. WebM).
+    """
+    try:
+        info = sf.info(str(path))
+    except (RuntimeError, sf.LibsndfileError):
+        return None
+    return info.duration, info.samplerate, info.channels
+
+
+def projected_bytes(duration_sec, sample_rate=TARGET_SAMPLE_RATE, channels=1):
+    """Peak audio memory the pipeline will need for a clip of this shape."""
+    decoded = duration_sec * sample_rate * channels * 2           # pydub int16
+    resampled = duration_sec * TARGET_SAMPLE_RATE * 2             # 16kHz mono int16
+    samples = duration_sec * TARGET_SAMPLE_RATE * 4               # float32 for Whisper/librosa
+    whisper = duration_sec * WHISPER_BYTES_PER_SEC
+    return int(decoded + resampled + samples + whisper)
+
+
+def check_duration(duration_sec):
+    if duration_sec > MAX_AUDIO_SEC:
+        raise LimitExceeded(
+            422, f"Audio too long ({duration_sec:.0f}s > {MAX_AUDIO_SEC:g}s limit)", "duration"
+        )
+
+
+def check_projected(duration_sec, sample_rate=TARGET_SAMPLE_RATE, channels=1):
+    needed = projected_bytes(duration_sec, sample_rate, channels)
+    if needed > MAX_REQUEST_MEMORY_BYTES:
+        raise LimitExceeded(
+            422, f"Audio would need ~{needed // (1024 * 1024)} MB to process "
+                 f"(limit {MAX_REQUEST_MEMORY_BYTES // (1024 * 1024)} MB)", "memory"
+        )
+    return needed
+
+
+def record(ledger):
+    ledger.finish()
+    with _stats_lock:
+        _stats["requests"] += 1
+        _stats["max_peak_bytes"] = max(_stats["max_peak_bytes"], ledger.peak)
+        for stage, peak in ledger.stage_peaks.items():
+            _stats["stage_peak_sum"][stage] = _stats["stage_peak_sum"].get(stage, 0) + peak
+        for stage, delta in ledger.stage_rss_deltas.items():
+            _stats["stage_rss_delta_sum"][stage] = _stats["stage_rss_delta_sum"].get(stage, 0) + delta
+        _stats["estimated"].update(ledger.estimates)
+
+
+def record_rejection(exc: LimitExceeded):
+    with _stats_lock:
+        _stats["rejected"][exc.reason] = _stats["rejected"].get(exc.reason, 0) + 1
+
+
+def get_stats():
+    with _stats_lock:
+        n = max(_stats["requests"], 1)
+        return {
+            "requests": _stats["requests"],
+            "rejected": dict(_stats["rejected"]),
+            "max_peak_bytes": _stats["max_peak_bytes"],
+            "avg_stage_peak_bytes": {k: v // n for k, v in _stats["stage_peak_sum"].items()},
+            # Holds in the peaks above whose size is an estimate, not a buffer length
+            "estimated_entries": sorted(_stats["estimated"]),
+            "avg_stage_rss_delta_bytes": {k: v // n for k, v in _stats["stage_rss_delta_sum"].items()},
+            "limits": {
+                "max_upload_bytes": MAX_UPLOAD_BYTES,
+                "max_audio_sec": MAX_AUDIO_SEC,
+                "max_request_memory_bytes": MAX_REQUEST_MEMORY_BYTES,
+            },
+            "rss_bytes": current_rss_bytes(),
+        }
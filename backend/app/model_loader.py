@@ -1,26 +1,366 @@
+import os
+from . import model_store
+if model_store.MODEL_STORE:
+    # Serving from the artifact store: nothing may reach for the network.
+    # Set before faster_whisper imports the hub client, which reads it once.
+    os.environ["HF_HUB_OFFLINE"] = "1"
 from faster_whisper import WhisperModel
+from contextlib import contextmanager
+from pathlib import Path
+import contextvars
+import json
+import random
+import threading
+import time
 import torch
 
 DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
 
-_model = None
+# Tuned profile written by `python -m backend.app.autotune`
+PROFILE_PATH = Path(os.getenv(
+    "PRONOUNCE_MODEL_PROFILE",
+    str(Path(__file__).resolve().parent / "model_profile.json")
+))
 
-def get_model():
-    global _model
+# Defaults when no tuned profile exists on this node.
+# 'base.en' for faster response time; 'tiny.en' for maximum speed (slightly less accurate)
+DEFAULT_SETTINGS = {
+    "model_size": "base.en",
+    "compute_type": "int8" if DEVICE == "cpu" else "float16",
+    "cpu_threads": 0,   # 0 = CTranslate2 default
+    "num_workers": 1,
+    "beam_size": 5,
+}
 
-    if _model is None:
-        # CHANGED: 'medium' -> 'base.en' for faster response time
-        # You can use 'tiny.en' for maximum speed (but slightly less accurate)
-        model_size = "base.en" 
-        
-        print(f"Loading FasterWhisper model: {model_size} on {DEVICE}...")
-        
-        _model = WhisperModel(
-            model_size,
-            device=DEVICE,
-            compute_type="int8" if DEVICE == "cpu" else "float16"
-        )
+# Replica pool: K model instances, each pinned to its own cores so their
+# intra-op threads don't compete. 1 replica with 0 cores = a single unpinned model.
+MODEL_REPLICAS = max(1, int(os.getenv("PRONOUNCE_MODEL_REPLICAS", "1")))
+CORES_PER_REPLICA = int(os.getenv("PRONOUNCE_CORES_PER_REPLICA", "0"))  # 0 = split available cores evenly
 
-        print("FasterWhisper model loaded successfully.")
+_pools = {}
+_load_lock = threading.Lock()
+# One lock per extra pool's model size, held while it loads; not _load_lock,
+# which routing needs on every request.
+_pool_locks = {}
+_pool_locks_lock = threading.Lock()
 
-    return _model
\ No newline at end of file
+# Main-model deployments (see `model_swap.py`): new requests go to the active
+# one, or to the candidate with probability ab_percent / 100.
+_deployments = {"active": None, "candidate": None, "ab_percent": 0.0, "generation": 0}
+_route = contextvars.ContextVar("model_deployment", default=None)
+
+
+def load_profile(path: Path = PROFILE_PATH) -> dict:
+    """
+    Merges the tuned profile (if any) over DEFAULT_SETTINGS.
+    A profile tuned on a different device is ignored.
+    """
+    settings = dict(DEFAULT_SETTINGS)
+    if not path.exists():
+        return settings
+
+    try:
+        with open(path) as f:
+            profile = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable model profile {path}: {e}")
+        return settings
+
+    if profile.get("device", DEVICE) != DEVICE:
+        print(f"Ignoring model profile tuned for {profile.get('device')} (running on {DEVICE}).")
+        return settings
+
+    settings.update({k: profile[k] for k in DEFAULT_SETTINGS if k in profile})
+    print(f"Loaded tuned model profile from {path}: {settings}")
+    return settings
+
+
+SETTINGS = load_profile()
+
+
+def get_decode_options() -> dict:
+    """Decoding options that belong to the current request's model deployment."""
+    return {"beam_size": current_deployment().settings["beam_size"]}
+
+
+def available_cores() -> list:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cores(replicas: int, per_replica: int = 0, cores: list = None) -> list:
+    """
+    Disjoint core sets, one per replica. If the machine is too small for
+    `replicas * per_replica` the sets wrap around (and overlap).
+    """
+    cores = cores or available_cores()
+    per_replica = per_replica or max(1, len(cores) // replicas)
+    if replicas * per_replica > len(cores):
+        print(f"Warning: {replicas} replicas x {per_replica} cores exceeds the {len(cores)} available; core sets overlap.")
+    return [
+        [cores[(r * per_replica + i) % len(cores)] for i in range(per_replica)]
+        for r in range(replicas)
+    ]
+
+
+def _load_pinned(model_size, cpu_threads, cores=None, settings=None):
+    """
+    Constructs a WhisperModel on a thread pinned to `cores`. CTranslate2's
+    worker threads are created in the constructor and inherit that affinity;
+    the calling thread's own affinity is untouched.
+    """
+    settings = settings or SETTINGS
+    result = {}
+
+    def load():
+        try:
+            if cores and hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(0, cores)
+            result["model"] = WhisperModel(
+                model_size,
+                device=DEVICE,
+                compute_type=settings["compute_type"],
+                cpu_threads=cpu_threads,
+                num_workers=settings["num_workers"],
+                local_files_only=bool(model_store.MODEL_STORE)
+            )
+        except BaseException as e:
+            result["error"] = e
+
+    loader = threading.Thread(target=load, name=f"load-{model_size}")
+    loader.start()
+    loader.join()
+    if "error" in result:
+        raise result["error"]
+    return result["model"]
+
+
+class Replica:
+    def __init__(self, model, cores):
+        self.model = model
+        self.cores = cores
+        self.in_flight = 0
+        self.served = 0
+
+
+class ReplicaPool:
+    """K pinned replicas of one model size; requests go to the least-loaded one."""
+
+    def __init__(self, model_size: str, replicas: int = 1, cores_per_replica: int = 0, settings: dict = None):
+        settings = settings or SETTINGS
+        self.model_size = model_size
+        self._lock = threading.Lock()
+        pin = DEVICE == "cpu" and (replicas > 1 or cores_per_replica > 0)
+
+        core_sets = partition_cores(replicas, cores_per_replica) if pin else [None] * replicas
+        # With an artifact store, load only from its verified local copy
+        source = model_size
+        if model_store.MODEL_STORE:
+            path, manifest, verify_sec = model_store.locate(model_size)
+            source = str(path)
+
+        self.replicas = []
+        for cores in core_sets:
+            cpu_threads = len(cores) if cores else settings["cpu_threads"]
+            print(f"Loading FasterWhisper model: {model_size} on {DEVICE} ({settings['compute_type']})"
+                  + (f", cores {cores}" if cores else "") + "...")
+            start = time.perf_counter()
+            self.replicas.append(Replica(_load_pinned(source, cpu_threads, cores, settings), cores))
+            if model_store.MODEL_STORE:
+                model_store.record_load(model_size, manifest, verify_sec, time.perf_counter() - start)
+        print(f"FasterWhisper model loaded successfully ({len(self.replicas)} replica(s)).")
+
+    @contextmanager
+    def acquire(self):
+        with self._lock:
+            replica = min(self.replicas, key=lambda r: (r.in_flight, r.served))
+            replica.in_flight += 1
+            replica.served += 1
+        try:
+            yield replica.model
+        finally:
+            with self._lock:
+                replica.in_flight -= 1
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(r.in_flight for r in self.replicas)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "replicas": [
+                    {"cores": r.cores, "in_flight": r.in_flight, "served": r.served}
+                    for r in self.replicas
+                ]
+            }
+
+
+class Deployment:
+    """
+    One main-model configuration. Its replica pool is loaded on first use.
+    Create through `new_deployment`, which numbers it.
+    """
+
+    def __init__(self, settings: dict, generation: int):
+        self.settings = dict(settings)
+        self.generation = generation
+        self.label = f"v{generation}:{settings['model_size']}/{settings['compute_type']}"
+        self.active_requests = 0
+        self._pool = None
+        self._released = False
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> ReplicaPool:
+        if self._pool is None:
+            with self._lock:
+                if self._released:
+                    # A straggler outlived the drain: never reload a retired model behind its back
+                    raise RuntimeError(f"Model deployment {self.label} was retired")
+                if self._pool is None:
+                    self._pool = ReplicaPool(
+                        self.settings["model_size"], MODEL_REPLICAS, CORES_PER_REPLICA, self.settings
+                    )
+        return self._pool
+
+    @property
+    def loaded(self) -> bool:
+        return self._pool is not None
+
+    def release(self):
+        """Drops the replicas for good; memory is freed once no request references them."""
+        with self._lock:
+            self._released = True
+            self._pool = None
+
+
+def _next_deployment(settings: dict) -> Deployment:
+    """Call with `_load_lock` held."""
+    _deployments["generation"] += 1
+    return Deployment(settings, _deployments["generation"])
+
+
+def new_deployment(settings: dict) -> Deployment:
+    """A new (not yet loaded or routed) deployment with the next generation number."""
+    with _load_lock:
+        return _next_deployment(settings)
+
+
+def active_deployment() -> Deployment:
+    if _deployments["active"] is None:
+        with _load_lock:
+            if _deployments["active"] is None:
+                _deployments["active"] = _next_deployment(SETTINGS)
+    return _deployments["active"]
+
+
+def current_deployment() -> Deployment:
+    """The deployment the current request was routed to (the active one outside `routed`)."""
+    return _route.get() or active_deployment()
+
+
+@contextmanager
+def routed():
+    """
+    Pins the current request to one deployment for its whole ASR pass, so
+    every model call it makes (draft, spans, alignment) hits the same arm.
+    """
+    active_deployment()
+    # Choosing and counting under one lock: a swap can't retire a deployment in between
+    with _load_lock:
+        deployment = _deployments["active"]
+        candidate = _deployments["candidate"]
+        if candidate is not None and random.random() * 100 < _deployments["ab_percent"]:
+            deployment = candidate
+        deployment.active_requests += 1
+    token = _route.set(deployment)
+    try:
+        yield deployment
+    finally:
+        _route.reset(token)
+        with _load_lock:
+            deployment.active_requests -= 1
+
+
+def set_candidate(deployment: Deployment, ab_percent: float):
+    with _load_lock:
+        _deployments["candidate"] = deployment
+        _deployments["ab_percent"] = ab_percent
+
+
+def promote(deployment: Deployment, from_candidate: bool = False) -> Deployment:
+    """
+    Atomically makes `deployment` active for new requests; returns the one it
+    replaced, or None if it is already active (or, with `from_candidate`, no
+    longer the candidate) so there is nothing to retire.
+    """
+    active_deployment()
+    with _load_lock:
+        previous = _deployments["active"]
+        if previous is deployment or (from_candidate and _deployments["candidate"] is not deployment):
+            return None
+        _deployments["active"] = deployment
+        if _deployments["candidate"] is deployment:
+            _deployments["candidate"] = None
+            _deployments["ab_percent"] = 0.0
+    return previous
+
+
+def clear_candidate(deployment: Deployment) -> Deployment:
+    """Drops `deployment` from the A/B test; None if it is not the candidate (any more)."""
+    with _load_lock:
+        candidate = _deployments["candidate"]
+        if candidate is None or candidate is not deployment:
+            return None
+        _deployments["candidate"] = None
+        _deployments["ab_percent"] = 0.0
+    return candidate
+
+
+def get_deployments() -> dict:
+    with _load_lock:
+        return dict(_deployments)
+
+
+def get_pool(model_size: str = None) -> ReplicaPool:
+    """
+    Returns the replica pool for a model size. The default (or the current
+    deployment's own size) is the routed main model; other sizes (e.g. the
+    cascade draft model) are pooled alongside it.
+    """
+    deployment = current_deployment()
+    if model_size is None or model_size == deployment.settings["model_size"]:
+        return deployment.pool
+
+    if model_size not in _pools:
+        with _pool_locks_lock:
+            size_lock = _pool_locks.setdefault(model_size, threading.Lock())
+        with size_lock:
+            if model_size not in _pools:
+                _pools[model_size] = ReplicaPool(model_size, MODEL_REPLICAS, CORES_PER_REPLICA)
+
+    return _pools[model_size]
+
+
+def acquire_model(model_size: str = None):
+    """Context manager yielding the least-loaded replica's WhisperModel."""
+    return get_pool(model_size).acquire()
+
+
+def get_model(model_size: str = None):
+    """
+    Returns a cached WhisperModel (the pool's first replica). Request paths
+    should use `acquire_model` so load spreads across replicas.
+    """
+    return get_pool(model_size).replicas[0].model
+
+
+def get_pool_stats() -> dict:
+    stats = {size: pool.stats() for size, pool in list(_pools.items())}
+    for role in ("active", "candidate"):
+        deployment = _deployments[role]
+        if deployment is not None and deployment.loaded:
+            stats[deployment.label] = deployment.pool.stats()
+    return stats
@@ -0,0 +1,255 @@
+"""
+Offline model artifact store.
+
+Models are staged ahead of time (on a connected machine) into a versioned
+directory tree, which is then copied to the deployment:
+
+    <store>/<name>/v1/{model.bin, config.json, tokenizer.json, ..., manifest.json}
+    <store>/<name>/CURRENT          -> "v1"
+
+When PRONOUNCE_MODEL_STORE is set, `model_loader` only loads from the store:
+no hub lookups, HF_HUB_OFFLINE is forced on for the serving process, and a
+missing artifact is an error rather than a download. (The staging commands
+below don't import `model_loader`, so they can still download.) Each artifact is checked against its manifest
+(PRONOUNCE_MODEL_STORE_VERIFY: size (default) | sha256 | off) and its verify
+and load times are reported under /metrics.
+
+Usage:
+    # CTranslate2 weights as published for faster-whisper
+    python -m backend.app.model_store stage base.en
+    # Convert from a Transformers checkpoint, pre-quantized to the serving compute type
+    python -m backend.app.model_store stage base.en --from-transformers openai/whisper-base.en --quantization int8
+    # Import a directory that was downloaded/converted elsewhere
+    python -m backend.app.model_store stage base.en --from-dir ./faster-whisper-base.en
+    python -m backend.app.model_store list
+    python -m backend.app.model_store verify base.en
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+MODEL_STORE = os.getenv("PRONOUNCE_MODEL_STORE")
+VERIFY_MODE = os.getenv("PRONOUNCE_MODEL_STORE_VERIFY", "size")
+
+MANIFEST = "manifest.json"
+CURRENT = "CURRENT"
+
+# Without these faster-whisper falls back to fetching them from the hub
+REQUIRED_FILES = ("model.bin", "config.json", "tokenizer.json")
+
+_stats_lock = threading.Lock()
+_stats = {}
+
+
+class ArtifactError(RuntimeError):
+    pass
+
+
+def _dir_name(name):
+    return name.replace("/", "--")
+
+
+def sha256_file(path, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest(model_dir: Path, name, version, source, quantization=None):
+    files = {}
+    for path in sorted(p for p in model_dir.rglob("*") if p.is_file() and p.name != MANIFEST):
+        files[str(path.relative_to(model_dir))] = {"bytes": path.stat().st_size, "sha256": sha256_file(path)}
+    return {
+        "name": name,
+        "version": version,
+        "source": source,
+        "quantization": quantization,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "files": files,
+    }
+
+
+def verify(model_dir: Path, manifest: dict, mode: str = VERIFY_MODE):
+    """Checks the artifact's files against its manifest; raises ArtifactError on mismatch."""
+    if mode == "off":
+        return
+    for rel, expected in manifest["files"].items():
+        path = model_dir / rel
+        if not path.is_file():
+            raise ArtifactError(f"{manifest['name']}@{manifest['version']}: missing {rel}")
+        if path.stat().st_size != expected["bytes"]:
+            raise ArtifactError(f"{manifest['name']}@{manifest['version']}: size mismatch for {rel}")
+        if mode == "sha256" and sha256_file(path) != expected["sha256"]:
+            raise ArtifactError(f"{manifest['name']}@{manifest['version']}: checksum mismatch for {rel}")
+
+
+def versions(store: Path, name):
+    base = store / _dir_name(name)
+    if not base.is_dir():
+        return []
+    found = [p.name for p in base.iterdir() if p.is_dir() and p.name[1:].isdigit() and (p / MANIFEST).exists()]
+    return sorted(found, key=lambda v: int(v[1:]))
+
+
+def current_version(store: Path, name):
+    pointer = store / _dir_name(name) / CURRENT
+    if pointer.exists():
+        return pointer.read_text().strip()
+    found = versions(store, name)
+    return found[-1] if found else None
+
+
+def locate(name, store=None, mode: str = VERIFY_MODE):
+    """
+    Resolves `name` or `name@vN` to a verified local directory.
+    Returns (path, manifest, verify_sec).
+    """
+    store = Path(store or MODEL_STORE)
+    name, _, version = name.partition("@")
+    version = version or current_version(store, name)
+    if version is None:
+        raise ArtifactError(f"Model '{name}' is not staged in {store}")
+
+    model_dir = store / _dir_name(name) / version
+    manifest_path = model_dir / MANIFEST
+    if not manifest_path.exists():
+        raise ArtifactError(f"Model '{name}@{version}' is not staged in {store}")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    start = time.perf_counter()
+    verify(model_dir, manifest, mode)
+    return model_dir, manifest, time.perf_counter() - start
+
+
+def record_load(name, manifest, verify_sec, load_sec):
+    with _stats_lock:
+        entry = _stats.setdefault(f"{name}@{manifest['version']}", {
+            "version": manifest["version"],
+            "quantization": manifest.get("quantization"),
+            "bytes": sum(f["bytes"] for f in manifest["files"].values()),
+            "verify": VERIFY_MODE,
+            "verify_sec": round(verify_sec, 3),
+            "load_sec": [],
+        })
+        entry["load_sec"].append(round(load_sec, 3))
+
+
+def get_stats():
+    with _stats_lock:
+        return {
+            "store": MODEL_STORE,
+            "artifacts": {k: {**v, "load_sec": list(v["load_sec"])} for k, v in _stats.items()},
+        }
+
+
+# ---------------------------
+# Staging
+# ---------------------------
+
+def stage(store: Path, name, from_transformers=None, from_dir=None, quantization=None):
+    """Fetches/converts a model into a new version directory and makes it CURRENT."""
+    base = store / _dir_name(name)
+    base.mkdir(parents=True, exist_ok=True)
+    existing = versions(store, name)
+    version = f"v{int(existing[-1][1:]) + 1 if existing else 1}"
+
+    staging = Path(tempfile.mkdtemp(prefix=f".{version}-", dir=base))
+    try:
+        if from_dir:
+            source = f"dir:{Path(from_dir).resolve()}"
+            shutil.copytree(from_dir, staging, dirs_exist_ok=True)
+        elif from_transformers:
+            from ctranslate2.converters import TransformersConverter
+            source = f"transformers:{from_transformers}"
+            converter = TransformersConverter(
+                from_transformers, copy_files=["tokenizer.json", "preprocessor_config.json"]
+            )
+            converter.convert(str(staging), quantization=quantization, force=True)
+        else:
+            from faster_whisper.utils import download_model
+            source = f"hub:{name}"
+            download_model(name, output_dir=str(staging))
+
+        # Hub download leftovers are not part of the artifact
+        shutil.rmtree(staging / ".cache", ignore_errors=True)
+        missing = [f for f in REQUIRED_FILES if not (staging / f).exists()]
+        if missing:
+            raise ArtifactError(f"Staged model is missing {', '.join(missing)}; it would not load offline")
+
+        manifest = build_manifest(staging, name, version, source, quantization)
+        with open(staging / MANIFEST, "w") as f:
+            json.dump(manifest, f, indent=2)
+
+        os.replace(staging, base / version)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    pointer_tmp = base / f".{CURRENT}.tmp"
+    pointer_tmp.write_text(version)
+    os.replace(pointer_tmp, base / CURRENT)
+    return base / version, manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--store", type=Path, default=Path(MODEL_STORE) if MODEL_STORE else None,
+                        help="store directory (default: PRONOUNCE_MODEL_STORE)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_stage = sub.add_parser("stage", help="fetch/convert a model into a new version")
+    p_stage.add_argument("name", help="model name as used by PRONOUNCE settings, e.g. base.en")
+    source = p_stage.add_mutually_exclusive_group()
+    source.add_argument("--from-transformers", metavar="REPO_OR_PATH")
+    source.add_argument("--from-dir", metavar="PATH")
+    p_stage.add_argument("--quantization", help="e.g. int8, int8_float16, float16 (--from-transformers only)")
+
+    sub.add_parser("list", help="list staged models")
+
+    p_verify = sub.add_parser("verify", help="full checksum verification")
+    p_verify.add_argument("name", help="name or name@vN")
+
+    args = parser.parse_args()
+    if args.store is None:
+        parser.error("Set --store or PRONOUNCE_MODEL_STORE")
+
+    if args.command == "stage":
+        if args.quantization and not args.from_transformers:
+            parser.error("--quantization requires --from-transformers")
+        path, manifest = stage(args.store, args.name, args.from_transformers, args.from_dir, args.quantization)
+        size = sum(f["bytes"] for f in manifest["files"].values())
+        print(f"Staged {args.name}@{manifest['version']} ({size / 1e6:.1f} MB) at {path}")
+
+    elif args.command == "list":
+        if not args.store.is_dir():
+            return
+        for base in sorted(p for p in args.store.iterdir() if p.is_dir()):
+            name = base.name.replace("--", "/")
+            current = current_version(args.store, name)
+            for version in versions(args.store, name):
+                with open(base / version / MANIFEST) as f:
+                    manifest = json.load(f)
+                size = sum(f["bytes"] for f in manifest["files"].values())
+                marker = "*" if version == current else " "
+                print(f"{marker} {name}@{version}  {size / 1e6:8.1f} MB  "
+                      f"{manifest.get('quantization') or '-':>12}  {manifest['source']}  {manifest['created']}")
+
+    elif args.command == "verify":
+        start = time.perf_counter()
+        path, manifest, _ = locate(args.name, args.store, mode="sha256")
+        print(f"OK {args.name.partition('@')[0]}@{manifest['version']}: "
+              f"{len(manifest['files'])} files verified in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Zero-downtime model hot swap and A/B routing.
+
+A swap runs in the background while the active model keeps serving:
+    loading -> warming -> promoted (ab_percent = 0)
+                       -> ab       (ab_percent > 0, candidate gets that share of new requests)
+The replaced deployment then drains (requests already routed to it finish on
+it) and its replicas are freed. ASR latency is recorded per deployment so the
+A/B arms can be compared before promoting or rolling back.
+"""
+
+import gc
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from . import model_loader
+from .audio_io import TARGET_SAMPLE_RATE
+from .model_loader import DEFAULT_SETTINGS, Deployment
+
+logger = logging.getLogger(__name__)
+
+DRAIN_TIMEOUT_SEC = float(os.getenv("PRONOUNCE_DRAIN_TIMEOUT_SEC", "600"))
+WARMUP_SEC = 2.0
+LATENCY_WINDOW = 500
+
+BUSY = ("loading", "warming", "draining")
+
+
+class SwapError(Exception):
+    pass
+
+
+_lock = threading.Lock()
+_state = {"status": "idle", "detail": None, "updated_at": time.time()}
+_latency = {}
+
+
+def _set_state(status, detail=None):
+    with _lock:
+        _state.update(status=status, detail=detail, updated_at=time.time())
+
+
+def warmup(deployment: Deployment):
+    """Runs a short decode on every replica so first-request costs are paid here."""
+    noise = np.random.default_rng(0).normal(0, 0.01, int(WARMUP_SEC * TARGET_SAMPLE_RATE)).astype(np.float32)
+    for replica in deployment.pool.replicas:
+        segments, _ = replica.model.transcribe(
+            noise, language="en", word_timestamps=True, vad_filter=False,
+            beam_size=deployment.settings["beam_size"]
+        )
+        list(segments)
+
+
+def _drain_and_free(deployment: Deployment):
+    _set_state("draining", deployment.label)
+    deadline = time.monotonic() + DRAIN_TIMEOUT_SEC
+    while deployment.active_requests > 0 and time.monotonic() < deadline:
+        time.sleep(0.1)
+    if deployment.active_requests > 0:
+        logger.warning(f"⚠️  {deployment.label}: {deployment.active_requests} request(s) still running after drain timeout")
+
+    deployment.release()
+    gc.collect()
+    logger.info(f"♻️  Released model {deployment.label}")
+    _set_state("idle", f"released {deployment.label}")
+
+
+def _run_swap(deployment: Deployment, ab_percent: float):
+    try:
+        _set_state("loading", deployment.label)
+        start = time.perf_counter()
+        deployment.pool  # loads the replicas
+        _set_state("warming", deployment.label)
+        warmup(deployment)
+        logger.info(f"🔁 Model {deployment.label} ready in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        logger.error(f"🔥 Model swap to {deployment.label} failed: {e}")
+        deployment.release()
+        _set_state("failed", str(e))
+        return
+
+    if ab_percent > 0:
+        model_loader.set_candidate(deployment, ab_percent)
+        _set_state("ab", f"{deployment.label} receives {ab_percent:g}% of new requests")
+        return
+
+    previous = model_loader.promote(deployment)
+    _drain_and_free(previous)
+
+
+def start_swap(settings: dict, ab_percent: float = 0.0) -> dict:
+    """
+    Loads a new main-model configuration in the background. `settings`
+    overrides the active deployment's (model_size, compute_type, ...).
+    """
+    unknown = set(settings) - set(DEFAULT_SETTINGS)
+    if unknown:
+        raise SwapError(f"Unknown model settings: {', '.join(sorted(unknown))}")
+    if not 0 <= ab_percent <= 100:
+        raise SwapError("ab_percent must be between 0 and 100")
+
+    with _lock:
+        if _state["status"] in BUSY:
+            raise SwapError(f"A swap is already {_state['status']} ({_state['detail']})")
+        if model_loader.get_deployments()["candidate"] is not None:
+            raise SwapError("A candidate is under A/B test; promote or roll it back first")
+        _state.update(status="loading", detail=None, updated_at=time.time())
+
+    deployment = model_loader.new_deployment({**model_loader.active_deployment().settings, **settings})
+    threading.Thread(target=_run_swap, args=(deployment, ab_percent), daemon=True).start()
+    return get_state()
+
+
+def _end_ab_test(action: str) -> Deployment:
+    """
+    Promotes or rolls back the candidate under the swap lock, so two admin
+    calls cannot both retire a deployment; returns the one to drain.
+    """
+    with _lock:
+        if _state["status"] in BUSY:
+            raise SwapError(f"A swap is already {_state['status']} ({_state['detail']})")
+        candidate = model_loader.get_deployments()["candidate"]
+        if candidate is None:
+            raise SwapError(f"No candidate to {action}")
+        if action == "promote":
+            retired = model_loader.promote(candidate, from_candidate=True)
+        else:
+            retired = model_loader.clear_candidate(candidate)
+        if retired is None:
+            raise SwapError(f"Candidate {candidate.label} changed; nothing to {action}")
+        _state.update(status="draining", detail=retired.label, updated_at=time.time())
+    return retired
+
+
+def promote_candidate() -> dict:
+    previous = _end_ab_test("promote")
+    threading.Thread(target=_drain_and_free, args=(previous,), daemon=True).start()
+    return get_state()
+
+
+def rollback() -> dict:
+    candidate = _end_ab_test("roll back")
+    threading.Thread(target=_drain_and_free, args=(candidate,), daemon=True).start()
+    return get_state()
+
+
+def record_latency(label: str, latency_sec: float, audio_sec: float = None):
+    with _lock:
+        _latency.setdefault(label, deque(maxlen=LATENCY_WINDOW)).append((latency_sec, audio_sec))
+
+
+def _summarize(samples):
+    latencies = np.array([l for l, _ in samples])
+    timed = [(l, a) for l, a in samples if a]
+    return {
+        "requests": len(samples),
+        "mean_sec": round(float(latencies.mean()), 3),
+        "p50_sec": round(float(np.percentile(latencies, 50)), 3),
+        "p95_sec": round(float(np.percentile(latencies, 95)), 3),
+        "rtf": round(sum(l for l, _ in timed) / sum(a for _, a in timed), 3) if timed else None,
+    }
+
+
+def get_state() -> dict:
+    model_loader.active_deployment()
+    deployments = model_loader.get_deployments()
+
+    def describe(deployment):
+        if deployment is None:
+            return None
+        return {"label": deployment.label, "settings": deployment.settings,
+                "loaded": deployment.loaded, "active_requests": deployment.active_requests}
+
+    with _lock:
+        state = dict(_state)
+        arms = {label: _summarize(samples) for label, samples in _latency.items() if samples}
+
+    state.update({
+        "active": describe(deployments["active"]),
+        "candidate": describe(deployments["candidate"]),
+        "ab_percent": deployments["ab_percent"],
+        "latency": arms,
+    })
+    return state
+
+
+ADMIN_OPS = {
+    "state": get_state,
+    "swap": start_swap,
+    "promote": promote_candidate,
+    "rollback": rollback,
+}
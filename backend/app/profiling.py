@@ -0,0 +1,164 @@
+"""
+On-demand per-request profiling.
+
+A request is profiled when an admin sends `X-Profile: sample|cprofile` with a
+valid `X-Admin-Token`, or when it is picked by PRONOUNCE_PROFILE_SAMPLE_RATE.
+
+- sample   (default): a side thread snapshots the request thread's stack every
+  few ms and writes collapsed stacks (`<id>.folded`), readable by
+  speedscope, flamegraph.pl and inferno. Frames are rooted at the pipeline
+  stage (upload/decode/resample/scoring/report).
+- cprofile: deterministic cProfile of the request thread (`<id>.prof`),
+  readable by snakeviz / pstats. Higher overhead.
+
+When neither trigger fires nothing is started.
+"""
+
+import cProfile
+import hmac
+import os
+import random
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+PROFILE_DIR = Path(os.getenv(
+    "PRONOUNCE_PROFILE_DIR",
+    str(Path(__file__).resolve().parent / "profiles")
+))
+PROFILE_SAMPLE_RATE = float(os.getenv("PRONOUNCE_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL_SEC = float(os.getenv("PRONOUNCE_PROFILE_INTERVAL_MS", "5")) / 1000
+PROFILE_KEEP = int(os.getenv("PRONOUNCE_PROFILE_KEEP", "200"))   # <= 0: keep all
+ADMIN_TOKEN = os.getenv("PRONOUNCE_ADMIN_TOKEN")
+
+MODES = ("sample", "cprofile")
+FORMATS = {"folded": "text/plain", "prof": "application/octet-stream"}
+
+
+def is_admin(token_header):
+    if not ADMIN_TOKEN or not token_header:
+        return False
+    return hmac.compare_digest(token_header.encode(), ADMIN_TOKEN.encode())
+
+
+def choose_mode(profile_header, admin_header):
+    """Returns the profiling mode for this request, or None (the common, zero-cost case)."""
+    if profile_header and is_admin(admin_header):
+        return profile_header if profile_header in MODES else "sample"
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sample"
+    return None
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id, stage_source=None, interval=PROFILE_INTERVAL_SEC):
+        self.thread_id = thread_id
+        self.stage_source = stage_source
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.reverse()
+            if self.stage_source is not None:
+                stack.insert(0, f"stage:{self.stage_source() or 'startup'}")
+            self.stacks[";".join(stack)] += 1
+            self.samples += 1
+
+    def write(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RequestProfile:
+    def __init__(self, mode, stage_source=None):
+        self.mode = mode
+        if mode == "cprofile":
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+                return
+            except ValueError:
+                # 3.12+: only one deterministic profiler per process; sample instead
+                self.mode = "sample"
+        self.profiler = SamplingProfiler(threading.get_ident(), stage_source).start()
+
+    def finish(self, request_id):
+        """Stops profiling and stores the result under `request_id`."""
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        if self.mode == "cprofile":
+            self.profiler.disable()
+            path = PROFILE_DIR / f"{request_id}.prof"
+            self.profiler.dump_stats(str(path))
+        else:
+            self.profiler.stop()
+            path = PROFILE_DIR / f"{request_id}.folded"
+            self.profiler.write(path)
+        _prune()
+        return path
+
+
+def start(mode, stage_source=None):
+    """Starts profiling the calling thread; returns None when `mode` is None."""
+    if mode is None:
+        return None
+    return RequestProfile(mode, stage_source)
+
+
+def _prune():
+    if PROFILE_KEEP <= 0:
+        return
+    files = sorted(
+        (p for p in PROFILE_DIR.iterdir() if p.suffix.lstrip(".") in FORMATS),
+        key=lambda p: p.stat().st_mtime,
+    )
+    for p in files[:-PROFILE_KEEP]:
+        p.unlink(missing_ok=True)
+
+
+def find_profile(request_id):
+    """Path of the stored profile for `request_id`, or None."""
+    if not request_id.isalnum():
+        return None
+    for fmt in FORMATS:
+        path = PROFILE_DIR / f"{request_id}.{fmt}"
+        if path.exists():
+            return path
+    return None
+
+
+def list_profiles():
+    if not PROFILE_DIR.exists():
+        return []
+    files = sorted(
+        (p for p in PROFILE_DIR.iterdir() if p.suffix.lstrip(".") in FORMATS),
+        key=lambda p: p.stat().st_mtime, reverse=True,
+    )
+    return [
+        {"request_id": p.stem, "format": p.suffix.lstrip("."), "bytes": p.stat().st_size,
+         "created": p.stat().st_mtime}
+        for p in files
+    ]
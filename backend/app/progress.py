@@ -0,0 +1,35 @@
+"""
+Per-request progress events (consumed by `/process-audio/stream`).
+
+Like the cancellation token, the event sink lives in a context variable so
+the pipeline stages (upload, decode, each transcribed segment, scoring) can
+report progress without threading it through every signature. Events are
+emitted from data the stage already has in hand, never from extra work.
+Outside a streaming request `emit` is a no-op.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+_sink = contextvars.ContextVar("progress_sink", default=None)
+
+
+def activate(sink):
+    """Makes `sink(event, data)` receive this request's events (call inside the worker thread)."""
+    return _sink.set(sink)
+
+
+def emit(event: str, **data):
+    sink = _sink.get()
+    if sink is not None:
+        sink(event, data)
+
+
+@contextmanager
+def muted():
+    """Suppresses events, e.g. for re-decodes of spans already reported."""
+    token = _sink.set(None)
+    try:
+        yield
+    finally:
+        _sink.reset(token)
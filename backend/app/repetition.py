@@ -0,0 +1,115 @@
+"""
+Repetition and restart detection over a recognized token stream.
+
+Finds spans where the reader says a phrase and immediately says it again:
+
+    word repeat     "the the dog"
+    phrase repeat   "the big the big dog"
+    restart         "the bi the big dog"   (first attempt ends in a cut-off word)
+
+Each position is compared with the next 1..PRONOUNCE_REPEAT_MAX_WORDS
+words, so a scan is O(n * max_words), i.e. linear in transcript length.
+Every multi-word repeat starts with the same word again, so almost all
+candidates are rejected by one integer compare before any slice is compared.
+
+Both copies of a repeat are labelled (the aligner may keep either one).
+For a restart only the cut-off first attempt is: the complete reading that
+follows is real speech and is scored as such. A one-word "fragment" must not
+be a word in its own right ("he her", "a an", "to today"): not a target
+word and not in the optional PRONOUNCE_LEXICON word list (one per line).
+
+A scan stops after PRONOUNCE_REPEAT_BUDGET_MS; the rest of the transcript
+is then left to the single-word check in `compute_text_score`.
+"""
+
+import os
+import threading
+import time
+
+MAX_PHRASE_WORDS = int(os.getenv("PRONOUNCE_REPEAT_MAX_WORDS", "6"))
+BUDGET_SEC = float(os.getenv("PRONOUNCE_REPEAT_BUDGET_MS", "100")) / 1000
+LEXICON_PATH = os.getenv("PRONOUNCE_LEXICON")
+
+CHECK_EVERY = 256   # positions between deadline checks
+
+_stats_lock = threading.Lock()
+_stats = {
+    "scans": 0,
+    "tokens": 0,
+    "spans": {"word_repeat": 0, "phrase_repeat": 0, "restart": 0},
+    "budget_exhausted": 0,
+}
+
+
+def _load_lexicon(path):
+    if not path:
+        return frozenset()
+    with open(path, encoding="utf-8") as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+
+LEXICON = _load_lexicon(LEXICON_PATH)
+
+
+def _is_fragment(part: str, word: str) -> bool:
+    """'bi' of 'big': a cut-off start of the word."""
+    return len(part) < len(word) and word.startswith(part)
+
+
+def find_repetitions(tokens, max_words: int = MAX_PHRASE_WORDS, budget_sec: float = BUDGET_SEC,
+                     known_words=frozenset()):
+    """
+    -> (labels, complete). labels[i] is "word_repeat" / "phrase_repeat" /
+    "restart" for tokens that are part of a repetition, else None.
+    `known_words` (e.g. the target words) are never taken for one-word
+    fragments. `complete` is False if the time budget ran out.
+    """
+    n = len(tokens)
+    labels = [None] * n
+    if n < 2:
+        return labels, True
+
+    deadline = time.perf_counter() + budget_sec
+    ids = {}
+    seq = [ids.setdefault(token, len(ids)) for token in tokens]
+
+    found = {"word_repeat": 0, "phrase_repeat": 0, "restart": 0}
+    complete = True
+    for i in range(n - 1):
+        if i % CHECK_EVERY == 0 and time.perf_counter() > deadline:
+            complete = False
+            break
+        # Longest repeat first, so "the big the big" is one phrase, not two words
+        for length in range(min(max_words, (n - i) // 2), 0, -1):
+            mid, end = i + length, i + 2 * length
+            if length > 1 and seq[mid] != seq[i]:
+                continue
+            if seq[i:mid] == seq[mid:end]:
+                kind = "word_repeat" if length == 1 else "phrase_repeat"
+                span_end = end
+            elif (seq[i:mid - 1] == seq[mid:end - 1] and _is_fragment(tokens[mid - 1], tokens[end - 1])
+                  and (length > 1 or (tokens[i] not in known_words and tokens[i] not in LEXICON))):
+                kind = "restart"
+                span_end = mid   # only the abandoned attempt
+            else:
+                continue
+            if labels[i] is None:
+                found[kind] += 1
+            for k in range(i, span_end):
+                labels[k] = labels[k] or kind
+            break
+
+    with _stats_lock:
+        _stats["scans"] += 1
+        _stats["tokens"] += n
+        for kind, count in found.items():
+            _stats["spans"][kind] += count
+        if not complete:
+            _stats["budget_exhausted"] += 1
+
+    return labels, complete
+
+
+def get_stats():
+    with _stats_lock:
+        return {**_stats, "spans": dict(_stats["spans"])}
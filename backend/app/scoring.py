@@ -3,13 +3,16 @@ import re
 from difflib import SequenceMatcher
 from jiwer import wer
 
+from .repetition import find_repetitions
+
 # -------------------------------
 # Normalization
 # -------------------------------
 
-def normalize_text(text: str) -> str:
+def normalize_text(text: str, lower: bool = True) -> str:
     """
     Standardizes text for comparison (lower, no punct, unicode fix).
+    `lower=False` keeps casing (e.g. when feeding text back to the model).
     """
     if not text:
         return ""
@@ -24,7 +27,9 @@ def normalize_text(text: str) -> str:
             continue
         cleaned.append(ch)
     
-    text = "".join(cleaned).lower()
+    text = "".join(cleaned)
+    if lower:
+        text = text.lower()
     text = re.sub(r"\s+", " ", text).strip()
     return text
 
@@ -35,12 +40,43 @@ def tokenize(text: str):
 # Dyslexia-aware scoring
 # -------------------------------
 
+STATUS_METRIC = {
+    "correct": "correct",
+    "substitution": "substitutions",
+    "deletion": "deletions",
+    "insertion": "insertions",
+    "stutter": "stutters",  # Self-corrections
+}
+
+def score_alignment(alignment: list, total_target: int):
+    """
+    Weighted accuracy of a word alignment -> (score, metrics).
+    Also used to re-score a stored alignment after a sentence was spliced in.
+    """
+    metrics = {name: 0 for name in STATUS_METRIC.values()}
+    for item in alignment:
+        metrics[STATUS_METRIC[item["status"]]] += 1
+
+    if total_target == 0:
+        return 0.0, metrics
+
+    # Weighted Penalties
+    penalty = (
+        metrics["substitutions"] * 1.0 +  # Strongest
+        metrics["deletions"] * 0.8 +      # Moderate
+        metrics["insertions"] * 0.4 +     # Light
+        metrics["stutters"] * 0.1         # Very Light (Empathy)
+    )
+    
+    raw = (total_target - penalty) / total_target
+    return max(0.0, min(100.0, raw * 100)), metrics
+
 def compute_text_score(target: str, recognized: str) -> dict:
     """
     Aligns text and calculates accuracy with empathy.
     
     Key Dyslexia Logic:
-    - Stuttering (The The) -> 10% Penalty (Almost ignored)
+    - Stuttering (The The / The big the big / The bi- the big) -> 10% Penalty (Almost ignored)
     - Insertion (The [blue] dog) -> 40% Penalty
     - Substitution (The [cat] ran) -> 100% Penalty
     """
@@ -51,18 +87,23 @@ def compute_text_score(target: str, recognized: str) -> dict:
     if not target_tokens:
         return {"text_score": 0.0, "word_alignment": []}
 
+    # Repeated phrases and restarts in what was read (linear-time scan)
+    repeats, _ = find_repetitions(rec_tokens, known_words=frozenset(target_tokens))
+
+    def added(ri):
+        """Alignment entry for a recognized word with no target counterpart."""
+        word_inserted = rec_tokens[ri]
+        kind = repeats[ri]
+        # Outside the scan (time budget ran out): is this word identical to the previous one?
+        if kind is None and ri > 0 and rec_tokens[ri-1] == word_inserted:
+            kind = "word_repeat"
+        if kind is None:
+            return {"target": "", "recognized": word_inserted, "status": "insertion"}
+        return {"target": "", "recognized": word_inserted, "status": "stutter", "repetition": kind}
+
     sm = SequenceMatcher(None, target_tokens, rec_tokens)
     alignment = []
     
-    # Metrics
-    metrics = {
-        "correct": 0,
-        "substitutions": 0,
-        "deletions": 0,
-        "insertions": 0,
-        "stutters": 0  # Self-corrections
-    }
-    
     for tag, i1, i2, j1, j2 in sm.get_opcodes():
         
         if tag == "equal":
@@ -72,7 +113,6 @@ def compute_text_score(target: str, recognized: str) -> dict:
                     "recognized": rec_tokens[ri],
                     "status": "correct"
                 })
-                metrics["correct"] += 1
                 
         elif tag == "replace":
             for ti, ri in zip(range(i1, i2), range(j1, j2)):
@@ -81,7 +121,11 @@ def compute_text_score(target: str, recognized: str) -> dict:
                     "recognized": rec_tokens[ri],
                     "status": "substitution"
                 })
-                metrics["substitutions"] += 1
+            # Uneven blocks: leftover target words were skipped, leftover recognized words added
+            for ti in range(i1 + (j2 - j1), i2):
+                alignment.append({"target": target_tokens[ti], "recognized": "", "status": "deletion"})
+            for ri in range(j1 + (i2 - i1), j2):
+                alignment.append(added(ri))
                 
         elif tag == "delete":
             for ti in range(i1, i2):
@@ -90,49 +134,12 @@ def compute_text_score(target: str, recognized: str) -> dict:
                     "recognized": "",
                     "status": "deletion"
                 })
-                metrics["deletions"] += 1
                 
         elif tag == "insert":
             for ri in range(j1, j2):
-                word_inserted = rec_tokens[ri]
-                
-                # Check for Stutter: Is this word identical to the previous one?
-                is_stutter = False
-                if ri > 0 and rec_tokens[ri-1] == word_inserted:
-                    is_stutter = True
-                
-                status_label = "stutter" if is_stutter else "insertion"
-                
-                alignment.append({
-                    "target": "",
-                    "recognized": word_inserted,
-                    "status": status_label
-                })
-                
-                if is_stutter:
-                    metrics["stutters"] += 1
-                else:
-                    metrics["insertions"] += 1
+                alignment.append(added(ri))
 
-    # -------------------------------
-    # Scoring Calculation
-    # -------------------------------
-    
-    total_target = len(target_tokens)
-    
-    if total_target == 0:
-        score = 0.0
-    else:
-        # Weighted Penalties
-        penalty = (
-            metrics["substitutions"] * 1.0 +  # Strongest
-            metrics["deletions"] * 0.8 +      # Moderate
-            metrics["insertions"] * 0.4 +     # Light
-            metrics["stutters"] * 0.1         # Very Light (Empathy)
-        )
-        
-        raw = (total_target - penalty) / total_target
-        score = max(0.0, min(100.0, raw * 100))
+    score, metrics = score_alignment(alignment, len(target_tokens))
 
     return {
         "text_score": round(score, 1),
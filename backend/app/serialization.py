@@ -0,0 +1,94 @@
+"""
+Response encoding for `/process-audio/`.
+
+- `fields=` selects the top-level sections to return, either by name
+  (`fields=overall_score,components`) or by preset (`fields=summary`).
+  Sections that aren't requested aren't serialized, and `logs` isn't even
+  captured.
+- JSON is encoded with orjson (falls back to the stdlib); clients sending
+  `Accept: application/msgpack` get MessagePack instead.
+"""
+
+import json
+
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # optional, stdlib json fallback
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional, JSON only
+    msgpack = None
+
+RESPONSE_FIELDS = (
+    "meta", "target_text", "recognized_text", "overall_score", "components",
+    "metrics", "word_alignment", "error_analysis", "logs",
+)
+
+FIELD_PRESETS = {
+    "full": set(RESPONSE_FIELDS),
+    # Everything the UI renders, minus the captured server logs
+    "report": set(RESPONSE_FIELDS) - {"logs"},
+    # Mobile / batch clients
+    "summary": {"meta", "overall_score", "components", "metrics"},
+}
+
+MSGPACK_TYPE = "application/msgpack"
+
+
+def parse_fields(fields):
+    """Resolves a `fields=` value to the set of top-level sections to return."""
+    if not fields:
+        return FIELD_PRESETS["full"]
+
+    selected = set()
+    for name in (f.strip() for f in fields.split(",")):
+        if not name:
+            continue
+        if name in FIELD_PRESETS:
+            selected |= FIELD_PRESETS[name]
+        elif name in RESPONSE_FIELDS:
+            selected.add(name)
+        else:
+            raise HTTPException(400, f"Unknown response field: {name}")
+    # Always identify the request
+    selected.add("meta")
+    return selected
+
+
+def _default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Type is not serializable: {type(obj).__name__}")
+
+
+def dumps_json(payload):
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(payload, default=_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def dumps_msgpack(payload):
+    return msgpack.packb(payload, default=_default, use_bin_type=True)
+
+
+def negotiate(accept):
+    """Picks the response format from the Accept header (checked before any work is done)."""
+    if accept and MSGPACK_TYPE in accept:
+        if msgpack is None:
+            raise HTTPException(406, "MessagePack responses are not available on this server")
+        return "msgpack"
+    return "json"
+
+
+def encode_response(payload, fmt="json"):
+    if fmt == "msgpack":
+        return Response(dumps_msgpack(payload), media_type=MSGPACK_TYPE)
+    return Response(dumps_json(payload), media_type="application/json")
@@ -0,0 +1,198 @@
+"""
+Stored assessments for partial re-reads (`/process-audio/reread`).
+
+A full assessment keeps its word alignment here, cut into one slice per
+sentence of the target text, plus the duration and the fluency / clarity
+components its response reported. When the reader re-records a single
+sentence only that clip goes through ASR; its alignment replaces the
+sentence's slice and the passage-level scores are recomputed from the
+merged alignment, which needs no model at all.
+
+Fluency and clarity are blended by reading time: untouched sentences keep
+their share of the original recording (proportional to their word count),
+re-read sentences count with their clip's duration and scores.
+
+Sessions live in process memory: at most PRONOUNCE_SESSION_MAX of them,
+idle ones expire after PRONOUNCE_SESSION_TTL_SEC. With several API workers
+a re-read has to reach the worker that scored the passage (sticky routing).
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from .scoring import tokenize
+
+SESSION_TTL_SEC = float(os.getenv("PRONOUNCE_SESSION_TTL_SEC", "3600"))
+SESSION_MAX = int(os.getenv("PRONOUNCE_SESSION_MAX", "1000"))
+
+# Sentence ends: . ! ? and the Devanagari danda, followed by whitespace
+SENTENCE_END = re.compile(r"(?<=[.!?।॥])\s+")
+
+_sessions = OrderedDict()
+_lock = threading.Lock()
+
+_stats = {
+    "saved": 0,
+    "rereads": 0,
+    "expired": 0,
+    "evicted": 0,
+    "misses": 0,
+}
+
+
+class SessionError(Exception):
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def split_sentences(text: str):
+    """Target text -> sentences that contain at least one scorable word."""
+    return [s for s in SENTENCE_END.split(text.strip()) if tokenize(s)]
+
+
+def _split_alignment(alignment, spans):
+    """
+    Cuts an alignment into one slice per (start, end) target-word span.
+    Words added after a sentence's last target word stay with that sentence.
+    """
+    slices = [[] for _ in spans]
+    k, consumed = 0, 0
+    for item in alignment:
+        if item.get("target"):
+            while k < len(spans) - 1 and consumed >= spans[k][1]:
+                k += 1
+            consumed += 1
+        slices[k].append(item)
+    return slices
+
+
+def _expire(now):
+    """Drops idle sessions (call with the lock held)."""
+    while _sessions:
+        session_id, session = next(iter(_sessions.items()))
+        if now - session["touched"] <= SESSION_TTL_SEC:
+            break
+        del _sessions[session_id]
+        _stats["expired"] += 1
+
+
+def _lookup(session_id):
+    """The live session, marked as used (call with the lock held)."""
+    now = time.monotonic()
+    _expire(now)
+    session = _sessions.get(session_id)
+    if session is None:
+        _stats["misses"] += 1
+        raise SessionError(404, f"Unknown or expired session: {session_id}")
+    session["touched"] = now
+    _sessions.move_to_end(session_id)
+    return session
+
+
+def _sentence(session, index):
+    if not 0 <= index < len(session["sentences"]):
+        raise SessionError(400, f"Sentence {index} out of range (passage has {len(session['sentences'])})")
+    return session["sentences"][index]
+
+
+def save(session_id, target_text, language, result, duration_sec):
+    """
+    Keeps a full assessment for later re-reads: the response-ready result,
+    i.e. with the report's fluency in `components` (the value that is shown
+    and blended, see `splice`).
+    """
+    sentences = split_sentences(target_text)
+    spans, start = [], 0
+    for sentence in sentences:
+        end = start + len(tokenize(sentence))
+        spans.append((start, end))
+        start = end
+    components = result.get("components", {})
+
+    session = {
+        "target_text": target_text,
+        "language": language,
+        "sentences": sentences,
+        "spans": spans,
+        "total_tokens": start,
+        "alignment": _split_alignment(result.get("word_alignment", []), spans) if spans else [],
+        "base": {
+            "duration_sec": duration_sec,
+            "fluency": components.get("fluency", 0.0),
+            "clarity": components.get("clarity", 0.0),
+        },
+        "rereads": {},
+        "touched": time.monotonic(),
+    }
+
+    with _lock:
+        _sessions[session_id] = session
+        _sessions.move_to_end(session_id)
+        _stats["saved"] += 1
+        _expire(session["touched"])
+        while len(_sessions) > SESSION_MAX:
+            _sessions.popitem(last=False)
+            _stats["evicted"] += 1
+
+
+def reread_target(session_id, index):
+    """(sentence text, language) for a re-read; raises SessionError (404 / 400)."""
+    with _lock:
+        session = _lookup(session_id)
+        return _sentence(session, index), session["language"]
+
+
+def splice(session_id, index, alignment, duration_sec, fluency, clarity):
+    """
+    Replaces sentence `index` with a re-read's alignment and scores and returns
+    the merged passage: {target_text, alignment, total_tokens, duration_sec, fluency, clarity}.
+    """
+    with _lock:
+        session = _lookup(session_id)
+        _sentence(session, index)
+        session["alignment"][index] = alignment
+        session["rereads"][index] = {"duration_sec": duration_sec, "fluency": fluency, "clarity": clarity}
+        _stats["rereads"] += 1
+
+        # Untouched sentences keep their word-count share of the original recording
+        reread_words = sum(session["spans"][i][1] - session["spans"][i][0] for i in session["rereads"])
+        base = session["base"]
+        base_sec = base["duration_sec"] * (1 - reread_words / max(session["total_tokens"], 1))
+        total_sec = base_sec + sum(r["duration_sec"] for r in session["rereads"].values())
+
+        def blend(key):
+            weighted = base[key] * base_sec + sum(r[key] * r["duration_sec"] for r in session["rereads"].values())
+            return weighted / total_sec if total_sec > 0 else base[key]
+
+        return {
+            "target_text": session["target_text"],
+            "alignment": [item for part in session["alignment"] for item in part],
+            "total_tokens": session["total_tokens"],
+            "duration_sec": total_sec,
+            "fluency": blend("fluency"),
+            "clarity": blend("clarity"),
+        }
+
+
+def describe(session_id):
+    """Sentences of a stored session (the indices `/process-audio/reread` takes)."""
+    with _lock:
+        session = _lookup(session_id)
+        return {
+            "session_id": session_id,
+            "language": session["language"],
+            "sentences": [
+                {"index": i, "text": text, "reread": i in session["rereads"]}
+                for i, text in enumerate(session["sentences"])
+            ],
+        }
+
+
+def get_stats():
+    with _lock:
+        return {"active": len(_sessions), **_stats}
@@ -0,0 +1,66 @@
+"""
+Deterministic stub ASR (PRONOUNCE_ASR_MODE=stub).
+
+Produces a plausible transcript from the target text, spread evenly over the
+audio, without loading a model. Used by the load-test harness to measure
+HTTP, decode and scoring overhead in isolation.
+"""
+
+import os
+import time
+
+from .audio_io import open_pcm16_wav, TARGET_SAMPLE_RATE
+from .progress import emit
+from .scoring import tokenize
+
+# Simulated model cost as a fraction of audio duration (0 = free)
+STUB_RTF = float(os.getenv("PRONOUNCE_STUB_RTF", "0"))
+
+SKIP_EVERY = 13     # every 13th target word is "skipped"
+REPEAT_EVERY = 29   # every 29th word is read twice (stutter)
+
+
+def _duration(audio_path, samples):
+    if samples is not None:
+        return len(samples) / TARGET_SAMPLE_RATE
+    pcm = open_pcm16_wav(audio_path)
+    if pcm is not None:
+        return len(pcm) / TARGET_SAMPLE_RATE
+    import soundfile as sf
+    return sf.info(str(audio_path)).duration
+
+
+def transcribe_stub(audio_path, target_text, samples=None):
+    """Same return structure as `transcribe_with_words`."""
+    duration = _duration(audio_path, samples)
+    if STUB_RTF > 0:
+        time.sleep(duration * STUB_RTF)
+
+    spoken = []
+    for i, token in enumerate(tokenize(target_text), start=1):
+        if i % SKIP_EVERY == 0:
+            continue
+        spoken.append(token)
+        if i % REPEAT_EVERY == 0:
+            spoken.append(token)
+
+    step = duration / max(len(spoken), 1)
+    words = []
+    for i, token in enumerate(spoken):
+        start = i * step
+        words.append({
+            "word": token,
+            "original_word": token,
+            "start": round(start, 3),
+            "end": round(start + step * 0.8, 3),
+            "duration": round(step * 0.8, 3),
+            "pause_before": round(step * 0.2, 3) if i else round(start, 3),
+            "confidence": 0.9,
+        })
+
+    emit("segment", start=0.0, end=round(duration, 3), text=" ".join(spoken))
+    return {
+        "text": " ".join(spoken),
+        "words": words,
+        "language_probs": 1.0,
+    }
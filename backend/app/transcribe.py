@@ -1,5 +1,7 @@
 import re
-from .model_loader import get_model
+from .model_loader import acquire_model, get_decode_options
+from .cancellation import check_cancelled
+from .progress import emit
 
 def clean_word(text: str) -> str:
     """
@@ -7,7 +9,8 @@ def clean_word(text: str) -> str:
     """
     return re.sub(r'[^\w\s]', '', text).strip()
 
-def transcribe_with_words(audio_path: str, language: str = "en"):
+def transcribe_with_words(audio_path: str, language: str = "en", samples=None,
+                          model=None, beam_size=None):
     """
     Dyslexia-optimized transcription.
     
@@ -15,19 +18,30 @@ def transcribe_with_words(audio_path: str, language: str = "en"):
     - VAD Filter: Ignores heavy breathing/thinking noises.
     - Confidence Scores: Detects uncertainty/mumbling.
     - Precise Timing: Captures hesitation intervals.
+
+    If `samples` (16kHz mono float32) is given, it is used instead of
+    decoding `audio_path` again. `model` / `beam_size` override the
+    tuned defaults (used by the auto-tuner).
     """
     
-    model = get_model()
+    if model is None:
+        # Hold a replica for the whole (lazily decoded) transcription
+        with acquire_model() as model:
+            return transcribe_with_words(audio_path, language, samples, model=model, beam_size=beam_size)
+
+    decode_options = get_decode_options()
+    if beam_size is not None:
+        decode_options["beam_size"] = beam_size
     
     # 1. Transcribe with VAD to reduce hallucinations during silence
     segments, info = model.transcribe(
-        audio_path,
+        samples if samples is not None else audio_path,
         language=language,
         task="transcribe",
         word_timestamps=True,
         vad_filter=True,
         vad_parameters=dict(min_silence_duration_ms=500),
-        beam_size=5
+        **decode_options
     )
     
     words = []
@@ -35,7 +49,11 @@ def transcribe_with_words(audio_path: str, language: str = "en"):
     prev_end = 0.0
     
     for segment in segments:
+        # Segments are decoded lazily: stopping here skips the rest of the audio
+        check_cancelled("transcription", info.duration - segment.end)
+
         full_text_parts.append(segment.text)
+        emit("segment", start=round(segment.start, 3), end=round(segment.end, 3), text=segment.text.strip())
         
         if not segment.words:
             continue
@@ -0,0 +1,154 @@
+"""
+Hugging Face Transformers ASR backend (PRONOUNCE_ASR_ROUTES "transformers:<model>").
+
+Runs a CTC checkpoint (wav2vec2 / HuBERT / MMS family, e.g. the IndicWav2Vec
+models) with greedy decoding. CTC gives one label per ~20ms frame, so word
+timestamps and confidences (mean frame probability) fall out of the same
+single forward pass; the result has the `transcribe_with_words` structure.
+
+Long clips are decoded in ≤30s windows cut at the quietest point near each
+boundary, so no window splits a word in the middle.
+"""
+
+import threading
+
+import numpy as np
+import torch
+
+from . import model_store
+from .audio_io import TARGET_SAMPLE_RATE
+from .cancellation import check_cancelled
+from .progress import emit
+from .transcribe import clean_word
+
+DEVICE = "cuda" if torch.cuda.is_available() else "cpu"
+
+WINDOW_SEC = 30.0
+CUT_SEARCH_SEC = 2.0    # look this far back from a window boundary for a pause
+CUT_FRAME_SEC = 0.02
+
+_models = {}
+_load_lock = threading.Lock()
+
+
+def get_ctc_model(model_id: str):
+    """Returns a cached (processor, model) pair; reads from the artifact store when one is configured."""
+    if model_id not in _models:
+        with _load_lock:
+            if model_id not in _models:
+                from transformers import AutoModelForCTC, AutoProcessor
+
+                source, offline = model_id, False
+                if model_store.MODEL_STORE:
+                    source, offline = str(model_store.locate(model_id)[0]), True
+
+                print(f"Loading Transformers CTC model: {model_id} on {DEVICE}...")
+                processor = AutoProcessor.from_pretrained(source, local_files_only=offline)
+                model = AutoModelForCTC.from_pretrained(source, local_files_only=offline).to(DEVICE).eval()
+                _models[model_id] = (processor, model)
+                print("Transformers CTC model loaded successfully.")
+
+    return _models[model_id]
+
+
+def window_bounds(samples, window_sec: float = WINDOW_SEC):
+    """(start, end) sample ranges of ≤window_sec, each cut at the quietest frame before the limit."""
+    window = int(window_sec * TARGET_SAMPLE_RATE)
+    search = int(CUT_SEARCH_SEC * TARGET_SAMPLE_RATE)
+    frame = int(CUT_FRAME_SEC * TARGET_SAMPLE_RATE)
+
+    bounds = []
+    start = 0
+    while len(samples) - start > window:
+        limit = start + window
+        region = samples[limit - search:limit]
+        energy = np.add.reduceat(region * region, np.arange(0, len(region), frame))
+        cut = limit - search + int(np.argmin(energy)) * frame
+        bounds.append((start, cut))
+        start = cut
+    bounds.append((start, len(samples)))
+    return bounds
+
+
+def _decode_window(processor, model, chunk, offset_sec):
+    inputs = processor(chunk, sampling_rate=TARGET_SAMPLE_RATE, return_tensors="pt")
+    with torch.inference_mode():
+        logits = model(inputs.input_values.to(DEVICE)).logits[0]
+    confidences, ids = logits.softmax(dim=-1).max(dim=-1)
+
+    tokenizer = processor.tokenizer
+    blank = tokenizer.pad_token_id
+    delimiter = tokenizer.convert_tokens_to_ids(getattr(tokenizer, "word_delimiter_token", "|"))
+    sec_per_frame = len(chunk) / TARGET_SAMPLE_RATE / max(len(ids), 1)
+
+    words, current, prev = [], None, None
+
+    def close():
+        if current and current["chars"]:
+            words.append({
+                "text": "".join(current["chars"]),
+                "start": offset_sec + current["first"] * sec_per_frame,
+                "end": offset_sec + (current["last"] + 1) * sec_per_frame,
+                "confidence": float(np.mean(current["probs"])),
+            })
+
+    for i, (token, prob) in enumerate(zip(ids.tolist(), confidences.tolist())):
+        if token == prev:
+            # CTC repeats collapse into one label
+            if current is not None and token not in (blank, delimiter):
+                current["last"] = i
+                current["probs"].append(prob)
+            continue
+        prev = token
+        if token == blank:
+            continue
+        if token == delimiter:
+            close()
+            current = None
+            continue
+        if current is None:
+            current = {"chars": [], "first": i, "last": i, "probs": []}
+        current["chars"].append(tokenizer.convert_ids_to_tokens(token))
+        current["last"] = i
+        current["probs"].append(prob)
+    close()
+    return words
+
+
+def transcribe_transformers(audio_path, language="en", samples=None, model_id=None):
+    """Same return structure as `transcribe_with_words`."""
+    if samples is None:
+        from faster_whisper.audio import decode_audio
+        samples = decode_audio(str(audio_path), sampling_rate=TARGET_SAMPLE_RATE)
+    processor, model = get_ctc_model(model_id)
+    duration = len(samples) / TARGET_SAMPLE_RATE
+
+    raw_words = []
+    for start, end in window_bounds(samples):
+        check_cancelled("transcription", duration - start / TARGET_SAMPLE_RATE)
+        window_words = _decode_window(processor, model, samples[start:end], start / TARGET_SAMPLE_RATE)
+        raw_words.extend(window_words)
+        emit("segment", start=round(start / TARGET_SAMPLE_RATE, 3), end=round(end / TARGET_SAMPLE_RATE, 3),
+             text=" ".join(w["text"] for w in window_words))
+
+    words = []
+    prev_end = 0.0
+    for w in raw_words:
+        cleaned = clean_word(w["text"])
+        if cleaned:
+            words.append({
+                "word": cleaned,
+                "original_word": w["text"],
+                "start": round(w["start"], 3),
+                "end": round(w["end"], 3),
+                "duration": round(w["end"] - w["start"], 3),
+                "pause_before": round(max(0.0, w["start"] - prev_end), 3),
+                "confidence": round(w["confidence"], 4),
+            })
+        prev_end = w["end"]
+
+    return {
+        "text": " ".join(w["original_word"] for w in words),
+        "words": words,
+        "language_probs": 1.0,
+    }
@@ -0,0 +1,86 @@
+"""
+Benchmark: ASR backends per language.
+
+Fixtures are laid out one directory per language, each holding audio files
+with same-named .txt targets:
+
+    fixtures/en/*.wav + *.txt
+    fixtures/hi/*.wav + *.txt
+
+Every backend spec (`backend` or `backend:model`, as in PRONOUNCE_ASR_ROUTES)
+runs over every language and reports the real-time factor (processing time /
+audio time; lower is faster) and accuracy against the target text. `routed`
+uses whatever PRONOUNCE_ASR_ROUTES selects for each language.
+
+Usage:
+    python -m backend.benchmarks.asr_backends fixtures/ \\
+        --backends faster-whisper,faster-whisper:small,transformers:ai4bharat/indicwav2vec-hindi,stub
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from backend.app import asr
+from backend.app.autotune import load_fixtures
+from backend.app.scoring import compute_text_score
+
+
+def run_backend(spec, fixtures, language):
+    if spec == "routed":
+        backend, model = asr.route(language)
+    else:
+        backend, _, model = spec.partition(":")
+        model = model or None
+
+    # Load / warm up outside the timed runs
+    first = fixtures[0]
+    asr.transcribe_local(first["name"], first["target"], language=language,
+                         samples=first["samples"], mode="full", backend=backend, model=model)
+
+    elapsed, audio_sec, accuracies = 0.0, 0.0, []
+    for fixture in fixtures:
+        start = time.perf_counter()
+        result = asr.transcribe_local(fixture["name"], fixture["target"], language=language,
+                                      samples=fixture["samples"], mode="full", backend=backend, model=model)
+        elapsed += time.perf_counter() - start
+        audio_sec += fixture["duration"]
+        accuracies.append(compute_text_score(fixture["target"], result["text"])["text_score"])
+
+    return {
+        "backend": result["asr_stats"]["model"],
+        "rtf": elapsed / audio_sec if audio_sec else 0.0,
+        "accuracy": sum(accuracies) / len(accuracies),
+        "audio_sec": audio_sec,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", type=Path, help="directory with one sub-directory per language")
+    parser.add_argument("--backends", default="routed,stub")
+    parser.add_argument("--languages", help="comma-separated subset of the language directories")
+    args = parser.parse_args()
+
+    languages = sorted(p.name for p in args.fixtures.iterdir() if p.is_dir())
+    if args.languages:
+        languages = [l for l in args.languages.split(",") if l in languages]
+    if not languages:
+        parser.error(f"No language directories in {args.fixtures}")
+
+    print(f"{'lang':>5}  {'backend':<48}{'audio s':>9}{'RTF':>8}{'accuracy':>10}")
+    for language in languages:
+        fixtures = load_fixtures(args.fixtures / language)
+        if not fixtures:
+            continue
+        for spec in args.backends.split(","):
+            try:
+                r = run_backend(spec, fixtures, language)
+            except Exception as e:
+                print(f"{language:>5}  {spec:<48}  failed: {e}")
+                continue
+            print(f"{language:>5}  {r['backend']:<48}{r['audio_sec']:>9.1f}{r['rtf']:>8.3f}{r['accuracy']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
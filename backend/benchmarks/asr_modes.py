@@ -0,0 +1,89 @@
+"""
+Benchmark: full main-model decode vs cascade vs forced alignment.
+
+Runs every fixture (audio + same-named .txt target) through each mode and
+reports wall time, the share of audio that needed (re-)decoding, speedup
+over the full decode and the accuracy difference against the target text.
+
+Usage:
+    python -m backend.benchmarks.asr_modes fixtures/ --language en
+    python -m backend.benchmarks.asr_modes fixtures/ --modes full,forced
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from backend.app.autotune import load_fixtures
+from backend.app.cascade import transcribe_cascade, DRAFT_MODEL
+from backend.app.forced_align import transcribe_forced
+from backend.app.model_loader import get_model, SETTINGS
+from backend.app.scoring import compute_text_score
+from backend.app.transcribe import transcribe_with_words
+
+MODES = {
+    "full": lambda f, lang: transcribe_with_words(f["name"], language=lang, samples=f["samples"]),
+    "cascade": lambda f, lang: transcribe_cascade(f["name"], f["target"], language=lang, samples=f["samples"]),
+    "forced": lambda f, lang: transcribe_forced(f["name"], f["target"], language=lang, samples=f["samples"]),
+}
+
+
+def decoded_fraction(mode, result):
+    stats = result.get("asr_stats", {})
+    if mode == "cascade":
+        return stats["escalated_fraction"]
+    if mode == "forced":
+        return stats["fallback_fraction"]
+    return 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", type=Path)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--modes", default="full,cascade,forced")
+    args = parser.parse_args()
+
+    modes = args.modes.split(",")
+    if "full" not in modes:
+        modes.insert(0, "full")  # baseline for speedup / accuracy deltas
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        parser.error(f"No fixtures (audio + .txt) found in {args.fixtures}")
+
+    # Load models up front so load time isn't billed to the first fixture
+    get_model()
+    if "cascade" in modes:
+        get_model(DRAFT_MODEL)
+
+    print(f"main={SETTINGS['model_size']} (beam {SETTINGS['beam_size']})  draft={DRAFT_MODEL} (greedy)")
+
+    totals = {m: {"sec": 0.0, "decoded": 0.0, "acc": 0.0} for m in modes}
+    audio_total = 0.0
+    for f in fixtures:
+        audio_total += f["duration"]
+        for mode in modes:
+            start = time.perf_counter()
+            result = MODES[mode](f, args.language)
+            elapsed = time.perf_counter() - start
+
+            totals[mode]["sec"] += elapsed
+            totals[mode]["decoded"] += decoded_fraction(mode, result) * f["duration"]
+            totals[mode]["acc"] += compute_text_score(f["target"], result["text"])["text_score"]
+
+    base = totals["full"]
+    print(f"{len(fixtures)} fixtures, {audio_total:.1f}s audio")
+    print(f"{'mode':<10}{'wall s':>9}{'rtf':>8}{'decoded %':>11}{'speedup':>9}{'acc':>8}{'Δacc':>8}")
+    for mode in modes:
+        t = totals[mode]
+        acc = t["acc"] / len(fixtures)
+        print(
+            f"{mode:<10}{t['sec']:>9.2f}{t['sec'] / audio_total:>8.3f}"
+            f"{t['decoded'] / audio_total * 100:>11.1f}{base['sec'] / t['sec']:>9.2f}"
+            f"{acc:>8.1f}{acc - base['acc'] / len(fixtures):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark: shared inference server throughput as client workers are added.
+
+Each client process stands in for one uvicorn worker and sends the same
+fixture over and over for `--duration` seconds. Start the server first:
+
+    python -m backend.app.inference_server --address /tmp/pronounce-infer.sock
+    python -m backend.benchmarks.inference_server fixture.wav "target text" \
+        --address /tmp/pronounce-infer.sock --workers 1,2,4,8
+"""
+
+import argparse
+import statistics
+import time
+from multiprocessing import Pool
+
+from backend.app.inference_client import _load_samples, request
+from backend.app.audio_io import TARGET_SAMPLE_RATE
+
+
+def _client(args):
+    address, audio_path, target_text, language, duration = args
+    samples = _load_samples(audio_path)
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        request({"op": "transcribe", "target_text": target_text, "language": language},
+                samples=samples, address=address)
+        latencies.append(time.perf_counter() - start)
+    return latencies, len(samples) / TARGET_SAMPLE_RATE
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio")
+    parser.add_argument("target_text")
+    parser.add_argument("--address", default="/tmp/pronounce-infer.sock")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--workers", default="1,2,4")
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8}{'req/s':>9}{'audio s/s':>11}{'p50 s':>9}{'p95 s':>9}")
+    for n in [int(w) for w in args.workers.split(",")]:
+        job = (args.address, args.audio, args.target_text, args.language, args.duration)
+        start = time.perf_counter()
+        with Pool(n) as pool:
+            results = pool.map(_client, [job] * n)
+        wall = time.perf_counter() - start
+
+        latencies = sorted(l for lat, _ in results for l in lat)
+        clip_sec = results[0][1]
+        if not latencies:
+            continue
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(
+            f"{n:>8}{len(latencies) / wall:>9.2f}{len(latencies) * clip_sec / wall:>11.2f}"
+            f"{statistics.median(latencies):>9.2f}{p95:>9.2f}"
+        )
+
+    print("server:", request({"op": "stats"}, address=args.address))
+
+
+if __name__ == "__main__":
+    main()
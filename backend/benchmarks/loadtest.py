@@ -0,0 +1,238 @@
+"""
+HTTP load test for `/process-audio/`.
+
+Replays a directory of recordings (WAV / WebM / FLAC, each optionally with a
+same-named .txt target; otherwise --target-text is used) against a running
+backend, stage by stage, and reports p50/p95/p99 latency, throughput, error
+rate and server RSS over time.
+
+In open mode latency is measured from each request's scheduled arrival, so
+time spent waiting for a free slot (--max-in-flight) counts against it
+(no coordinated omission).
+
+Server RSS comes from /metrics, which answers for one worker process at a
+time; the report sums the latest reading of every worker pid seen so far
+(workers that never answered a sample are missing from the sum).
+
+Arrival patterns:
+- closed: N virtual readers, each sends its next request as soon as the last returns
+- open:   requests arrive at R req/s (Poisson or constant), regardless of responses
+
+To isolate HTTP + decode + scoring overhead from model cost, run the server
+with the stub ASR:
+    PRONOUNCE_ASR_MODE=stub uvicorn backend.app.main:app --port 8000
+
+Usage:
+    python -m backend.benchmarks.loadtest fixtures/ --ramp 1,2,4,8 --stage-sec 30
+    python -m backend.benchmarks.loadtest fixtures/ --pattern open --ramp 0.5,1,2 --arrivals poisson
+"""
+
+import argparse
+import itertools
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+AUDIO_SUFFIXES = {".wav", ".webm", ".flac"}
+MIME = {".wav": "audio/wav", ".webm": "audio/webm", ".flac": "audio/flac"}
+
+
+def load_recordings(fixture_dir: Path, default_text: str):
+    recordings = []
+    for path in sorted(fixture_dir.iterdir()):
+        if path.suffix.lower() not in AUDIO_SUFFIXES:
+            continue
+        text_path = path.with_suffix(".txt")
+        target = text_path.read_text(encoding="utf-8").strip() if text_path.exists() else default_text
+        recordings.append({
+            "name": path.name,
+            "bytes": path.read_bytes(),
+            "mime": MIME[path.suffix.lower()],
+            "target": target,
+        })
+    return recordings
+
+
+class Recorder:
+    """Thread-safe collection of (stage, latency, ok) samples."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = []
+
+    def add(self, stage, latency, ok, status):
+        with self.lock:
+            self.samples.append((stage, latency, ok, status))
+
+    def stage(self, stage):
+        with self.lock:
+            return [s for s in self.samples if s[0] == stage]
+
+
+def make_session(pool_size):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def send(session, url, recording, language, stage, recorder, scheduled=None):
+    """`scheduled`: when the request should have been sent (open mode); latency counts from there."""
+    start = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        r = session.post(
+            url,
+            files={"file": (recording["name"], recording["bytes"], recording["mime"])},
+            data={"target_text": recording["target"], "language": language},
+            timeout=600,
+        )
+        recorder.add(stage, time.perf_counter() - start, r.status_code == 200, r.status_code)
+    except requests.RequestException as e:
+        recorder.add(stage, time.perf_counter() - start, False, type(e).__name__)
+
+
+def run_closed(session, url, recordings, language, users, stage_sec, recorder, stage):
+    deadline = time.perf_counter() + stage_sec
+    cycle = itertools.cycle(recordings)
+    cycle_lock = threading.Lock()
+
+    def user():
+        while time.perf_counter() < deadline:
+            with cycle_lock:
+                recording = next(cycle)
+            send(session, url, recording, language, stage, recorder)
+
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        for _ in range(users):
+            pool.submit(user)
+
+
+def run_open(session, url, recordings, language, rate, stage_sec, arrivals, recorder, stage, max_in_flight):
+    deadline = time.perf_counter() + stage_sec
+    cycle = itertools.cycle(recordings)
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        next_at = time.perf_counter()
+        while next_at < deadline:
+            time.sleep(max(0.0, next_at - time.perf_counter()))
+            pool.submit(send, session, url, next(cycle), language, stage, recorder, next_at)
+            gap = random.expovariate(rate) if arrivals == "poisson" else 1.0 / rate
+            next_at += gap
+
+
+def sample_server_rss(metrics_url, stop, timeline, interval):
+    session = requests.Session()
+    t0 = time.perf_counter()
+    while not stop.is_set():
+        try:
+            process = session.get(metrics_url, timeout=5).json()["process"]
+            pid, rss = process["pid"], process["rss_bytes"]
+        except (requests.RequestException, ValueError, KeyError):
+            pid, rss = None, None
+        timeline.append((round(time.perf_counter() - t0, 1), pid, rss))
+        stop.wait(interval)
+
+
+def total_rss(timeline):
+    """(sum of the latest RSS per worker pid, number of pids seen)."""
+    latest = {}
+    for _, pid, rss in list(timeline):
+        if rss:
+            latest[pid] = rss
+    return (sum(latest.values()) or None), len(latest)
+
+
+def summarize(samples, wall):
+    latencies = np.array([s[1] for s in samples]) if samples else np.array([0.0])
+    ok = sum(1 for s in samples if s[2])
+    statuses = {}
+    for s in samples:
+        statuses[str(s[3])] = statuses.get(str(s[3]), 0) + 1
+    return {
+        "requests": len(samples),
+        "throughput_rps": round(ok / wall, 3) if wall else 0.0,
+        "error_rate": round(1 - ok / len(samples), 4) if samples else 0.0,
+        "p50": round(float(np.percentile(latencies, 50)), 3),
+        "p95": round(float(np.percentile(latencies, 95)), 3),
+        "p99": round(float(np.percentile(latencies, 99)), 3),
+        "statuses": statuses,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", type=Path)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--target-text", default="The forest was alive with the sounds of early morning.")
+    parser.add_argument("--pattern", choices=["closed", "open"], default="closed")
+    parser.add_argument("--ramp", default="1,2,4,8",
+                        help="users per stage (closed) or req/s per stage (open)")
+    parser.add_argument("--arrivals", choices=["poisson", "constant"], default="poisson")
+    parser.add_argument("--stage-sec", type=float, default=30.0)
+    parser.add_argument("--max-in-flight", type=int, default=64, help="open pattern only")
+    parser.add_argument("--rss-interval", type=float, default=1.0)
+    parser.add_argument("--json", type=Path, help="also write the full report here")
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.fixtures, args.target_text)
+    if not recordings:
+        parser.error(f"No recordings found in {args.fixtures}")
+
+    url = args.url.rstrip("/") + "/process-audio/"
+    ramp = [float(x) for x in args.ramp.split(",")]
+    pool_size = int(max(ramp)) if args.pattern == "closed" else args.max_in_flight
+    session = make_session(pool_size)
+    recorder = Recorder()
+
+    stop = threading.Event()
+    rss_timeline = []
+    rss_thread = threading.Thread(
+        target=sample_server_rss,
+        args=(args.url.rstrip("/") + "/metrics", stop, rss_timeline, args.rss_interval),
+        daemon=True,
+    )
+    rss_thread.start()
+
+    report = {"pattern": args.pattern, "arrivals": args.arrivals, "stages": []}
+    unit = "users" if args.pattern == "closed" else "req/s"
+    print(f"{unit:>8}{'reqs':>7}{'rps':>8}{'err %':>8}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}{'rss MB':>9}{'workers':>9}")
+
+    for level in ramp:
+        stage = f"{level:g}"
+        start = time.perf_counter()
+        if args.pattern == "closed":
+            run_closed(session, url, recordings, args.language, int(level), args.stage_sec, recorder, stage)
+        else:
+            run_open(session, url, recordings, args.language, level, args.stage_sec,
+                     args.arrivals, recorder, stage, args.max_in_flight)
+        wall = time.perf_counter() - start
+
+        summary = summarize(recorder.stage(stage), wall)
+        rss, workers = total_rss(rss_timeline)
+        summary.update({"level": level, "rss_bytes": rss, "rss_workers": workers})
+        report["stages"].append(summary)
+        print(
+            f"{stage:>8}{summary['requests']:>7}{summary['throughput_rps']:>8.2f}"
+            f"{summary['error_rate'] * 100:>8.1f}{summary['p50']:>8.2f}{summary['p95']:>8.2f}"
+            f"{summary['p99']:>8.2f}{(rss or 0) / 1e6:>9.1f}{workers:>9}"
+        )
+
+    stop.set()
+    rss_thread.join()
+    report["rss_timeline"] = rss_timeline
+
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Repetition / restart detection benchmark.
+
+Builds synthetic readings of --words words with injected word repeats,
+phrase repeats and restarts, then times `find_repetitions` against a plain
+scan over the same window (every length 1..max_words compared slice by
+slice, no first-word filter, no budget) and reports how many repetitions
+each finds. Both are O(n * max_words); the difference is the constant.
+
+Usage:
+    python -m backend.benchmarks.repetition --words 500,2000,5000,20000
+"""
+
+import argparse
+import random
+import time
+
+from backend.app import repetition
+
+def vocabulary(size=3000, seed=1):
+    rng = random.Random(seed)
+    return ["".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(3, 9)))
+            for _ in range(size)]
+
+VOCAB = vocabulary()
+
+
+def synthetic_reading(n_words, rate=0.03, seed=0):
+    """-> (tokens, number of injected repetitions)."""
+    rng = random.Random(seed)
+    tokens, injected = [], 0
+    while len(tokens) < n_words:
+        phrase = [rng.choice(VOCAB) for _ in range(rng.randint(1, 4))]
+        if rng.random() < rate:
+            injected += 1
+            roll = rng.random()
+            if roll < 0.4:
+                tokens.extend(phrase[:1])                               # word repeat
+            elif roll < 0.7:
+                tokens.extend(phrase)                                   # phrase repeat
+            else:
+                tokens.extend(phrase[:-1] + [phrase[-1][:2]])           # restart
+        tokens.extend(phrase)
+    return tokens, injected
+
+
+def plain_repetitions(tokens, max_words):
+    """Same window as `find_repetitions`, every candidate compared slice by slice."""
+    found = 0
+    i = 0
+    while i < len(tokens) - 1:
+        for length in range(min(max_words, (len(tokens) - i) // 2), 0, -1):
+            first, second = tokens[i:i + length], tokens[i + length:i + 2 * length]
+            if len(second) == length and (first == second or (
+                    first[:-1] == second[:-1] and len(first[-1]) < len(second[-1])
+                    and second[-1].startswith(first[-1]))):
+                found += 1
+                i += length - 1
+                break
+        i += 1
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", default="500,2000,5000,20000")
+    parser.add_argument("--max-words", type=int, default=repetition.MAX_PHRASE_WORDS)
+    parser.add_argument("--budget-ms", type=float, default=repetition.BUDGET_SEC * 1000)
+    args = parser.parse_args()
+
+    print(f"{'words':>7}{'injected':>10}{'scan ms':>10}{'found':>8}{'complete':>10}{'plain ms':>10}{'found':>8}")
+    for n in map(int, args.words.split(",")):
+        tokens, injected = synthetic_reading(n)
+
+        start = time.perf_counter()
+        labels, complete = repetition.find_repetitions(tokens, args.max_words, args.budget_ms / 1000)
+        scan_ms = (time.perf_counter() - start) * 1000
+        found = sum(1 for i, label in enumerate(labels) if label and (i == 0 or not labels[i - 1]))
+
+        start = time.perf_counter()
+        plain_found = plain_repetitions(tokens, args.max_words)
+        plain_ms = (time.perf_counter() - start) * 1000
+
+        print(f"{len(tokens):>7}{injected:>10}{scan_ms:>10.1f}{found:>8}{str(complete):>10}{plain_ms:>10.1f}{plain_found:>8}")
+
+
+if __name__ == "__main__":
+    main()
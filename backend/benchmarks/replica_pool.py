@@ -0,0 +1,117 @@
+"""
+Model replica pool throughput benchmark.
+
+Runs the same concurrent transcription load against several pool layouts and
+reports throughput (requests/s and audio-seconds per second) and latency.
+Each layout is REPLICASxCORES; `1x0` is the single unpinned model the server
+uses by default, the baseline every other row is compared with.
+
+Fixtures: a directory of audio files (any format faster-whisper can decode).
+
+Usage:
+    python -m backend.benchmarks.replica_pool fixtures/ --configs 1x0,2x4,4x2,8x1 --clients 8
+"""
+
+import argparse
+import gc
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from faster_whisper.audio import decode_audio
+
+from backend.app.audio_io import TARGET_SAMPLE_RATE
+from backend.app.model_loader import SETTINGS, ReplicaPool, available_cores
+from backend.app.transcribe import transcribe_with_words
+
+AUDIO_SUFFIXES = {".wav", ".webm", ".flac", ".mp3", ".ogg", ".m4a"}
+
+
+def load_clips(fixture_dir: Path):
+    clips = []
+    for path in sorted(fixture_dir.iterdir()):
+        if path.suffix.lower() in AUDIO_SUFFIXES:
+            samples = decode_audio(str(path), sampling_rate=TARGET_SAMPLE_RATE)
+            clips.append({"name": path.name, "samples": samples, "duration": len(samples) / TARGET_SAMPLE_RATE})
+    return clips
+
+
+def run_load(pool, clips, clients, requests, language):
+    latencies = []
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def client():
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            clip = clips[i % len(clips)]
+            start = time.perf_counter()
+            with pool.acquire() as model:
+                transcribe_with_words(clip["name"], language=language, samples=clip["samples"], model=model)
+            with lock:
+                latencies.append((time.perf_counter() - start, clip["duration"]))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        for _ in range(clients):
+            executor.submit(client)
+    wall = time.perf_counter() - start
+
+    lat = np.array([l for l, _ in latencies])
+    return {
+        "requests": len(latencies),
+        "wall_sec": round(wall, 2),
+        "rps": round(len(latencies) / wall, 3),
+        "audio_sec_per_sec": round(sum(d for _, d in latencies) / wall, 2),
+        "p50": round(float(np.percentile(lat, 50)), 3),
+        "p95": round(float(np.percentile(lat, 95)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", type=Path)
+    parser.add_argument("--configs", default="1x0,2x0,4x0", help="REPLICASxCORES, 0 cores = split evenly")
+    parser.add_argument("--clients", type=int, default=0, help="concurrent requests (default: available cores)")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--model-size", default=SETTINGS["model_size"])
+    args = parser.parse_args()
+
+    clips = load_clips(args.fixtures)
+    if not clips:
+        parser.error(f"No audio found in {args.fixtures}")
+    clients = args.clients or len(available_cores())
+    print(f"{len(available_cores())} cores, {clients} concurrent clients, {args.requests} requests per layout")
+
+    print(f"{'layout':>8}{'rps':>8}{'audio s/s':>11}{'p50 s':>8}{'p95 s':>8}{'vs 1x0':>8}")
+    baseline = None
+    for config in args.configs.split(","):
+        replicas, cores = (int(x) for x in config.split("x"))
+        pool = ReplicaPool(args.model_size, replicas, cores)
+
+        # Warm every replica so first-call costs don't land in the timing
+        for replica in pool.replicas:
+            transcribe_with_words(clips[0]["name"], language=args.language,
+                                  samples=clips[0]["samples"], model=replica.model)
+
+        result = run_load(pool, clips, clients, args.requests, args.language)
+        if baseline is None and config == "1x0":
+            baseline = result["rps"]
+        speedup = f"{result['rps'] / baseline:.2f}x" if baseline else "-"
+        print(
+            f"{config:>8}{result['rps']:>8.2f}{result['audio_sec_per_sec']:>11.2f}"
+            f"{result['p50']:>8.2f}{result['p95']:>8.2f}{speedup:>8}"
+        )
+
+        del pool
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Response encoding benchmark for `/process-audio/`.
+
+Compares FastAPI's default path (jsonable_encoder + json.dumps) with orjson
+and MessagePack, for each `fields=` preset, and reports encoded size and
+encode time per response. Uses a synthetic response of --words words, or a
+captured one (--response saved from the endpoint).
+
+Usage:
+    python -m backend.benchmarks.serialization --words 200,1000,3000
+    python -m backend.benchmarks.serialization --response captured.json
+"""
+
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.app import serialization
+
+VOCAB = (
+    "the forest was alive with sounds of early morning sunlight filtered through "
+    "dense canopy ancient oak trees casting dappled shadows on mossy ground below"
+).split()
+
+
+def synthetic_response(n_words, seed=0):
+    rng = random.Random(seed)
+    alignment = []
+    errors = []
+    for _ in range(n_words):
+        word = rng.choice(VOCAB)
+        roll = rng.random()
+        if roll < 0.85:
+            alignment.append({"target": word, "recognized": word, "status": "correct"})
+        elif roll < 0.93:
+            other = rng.choice(VOCAB)
+            alignment.append({"target": word, "recognized": other, "status": "substitution"})
+            errors.append({"type": "substitution", "expected": word, "actual": other, "similarity": 31.5})
+        else:
+            alignment.append({"target": word, "recognized": "", "status": "deletion"})
+            errors.append({"type": "deletion", "expected": word, "actual": "(Skipped)"})
+
+    logs = [
+        {"level": "INFO", "message": f"🧠 log line {i} " + "x" * 60, "timestamp": 1.7e9 + i}
+        for i in range(12 + n_words // 100)
+    ]
+    return {
+        "meta": {"session_id": "0" * 32, "latency_sec": 4.2, "language": "en", "asr": {"mode": "full"}},
+        "target_text": " ".join(a["target"] for a in alignment),
+        "recognized_text": " ".join(a["recognized"] for a in alignment if a["recognized"]),
+        "overall_score": 81.3,
+        "components": {"accuracy": 85.0, "fluency": 77.2, "clarity": 80.1},
+        "metrics": {"wpm": 96, "accuracy": 85.0, "fluency": 77.2, "correct_count": n_words},
+        "word_alignment": alignment,
+        "error_analysis": errors,
+        "logs": logs,
+    }
+
+
+def fastapi_default(payload):
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+ENCODERS = {
+    "fastapi": fastapi_default,
+    "orjson": serialization.dumps_json,
+}
+if serialization.msgpack is not None:
+    ENCODERS["msgpack"] = serialization.dumps_msgpack
+
+
+def time_encoder(encode, payload, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = encode(payload)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return len(body), timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", default="200,1000,3000")
+    parser.add_argument("--response", type=Path, help="captured /process-audio/ JSON response")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    if args.response:
+        cases = [(args.response.name, json.loads(args.response.read_text(encoding="utf-8")))]
+    else:
+        cases = [(f"{n} words", synthetic_response(n)) for n in (int(x) for x in args.words.split(","))]
+
+    # Baseline for every row: today's endpoint (full response, default encoder)
+    print(f"{'response':>12}{'fields':>9}{'encoder':>9}{'bytes':>10}{'size %':>8}{'ms':>9}{'speedup':>9}")
+    for label, full in cases:
+        base_bytes, base_sec = time_encoder(fastapi_default, full, args.repeats)
+        for preset, selected in serialization.FIELD_PRESETS.items():
+            payload = {k: v for k, v in full.items() if k in selected}
+            for name, encode in ENCODERS.items():
+                size, sec = time_encoder(encode, payload, args.repeats)
+                print(
+                    f"{label:>12}{preset:>9}{name:>9}{size:>10}{size / base_bytes * 100:>8.1f}"
+                    f"{sec * 1000:>9.3f}{base_sec / sec if sec else 0:>8.1f}x"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark: general decode path vs zero-copy fast path for 16kHz mono PCM WAV uploads.
+
+Replays what `process_audio` does before the model runs:
+- general: pydub decode -> silence/duration checks -> resample -> export clean WAV
+           -> decode again for Whisper -> decode again for librosa clarity
+- fast:    parse header + memmap -> silence/duration checks -> one float32 conversion
+           shared by Whisper and clarity scoring
+
+Usage:
+    python -m backend.benchmarks.wav_fast_path --seconds 60 --repeats 5
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import librosa
+import numpy as np
+import soundfile as sf
+from faster_whisper.audio import decode_audio
+from pydub import AudioSegment
+
+from backend.app.audio_io import open_pcm16_wav, pcm16_to_float32, TARGET_SAMPLE_RATE
+
+
+def make_fixture(path: Path, seconds: float):
+    t = np.arange(int(seconds * TARGET_SAMPLE_RATE)) / TARGET_SAMPLE_RATE
+    y = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.02 * np.random.randn(len(t))
+    sf.write(path, y.astype(np.float32), TARGET_SAMPLE_RATE, subtype="PCM_16")
+
+
+def general_path(raw_path: Path, clean_path: Path):
+    audio = AudioSegment.from_file(str(raw_path))
+    _ = audio.duration_seconds
+    _ = audio.max_dBFS == -float("inf")
+    audio = audio.set_frame_rate(TARGET_SAMPLE_RATE).set_channels(1).set_sample_width(2)
+    audio.export(clean_path, format="wav")
+    whisper_input = decode_audio(str(clean_path), sampling_rate=TARGET_SAMPLE_RATE)
+    clarity_input, _ = librosa.load(str(clean_path), sr=TARGET_SAMPLE_RATE, duration=30)
+    return whisper_input, clarity_input
+
+
+def fast_path(raw_path: Path):
+    pcm = open_pcm16_wav(raw_path)
+    _ = len(pcm) / TARGET_SAMPLE_RATE
+    _ = not np.any(pcm)
+    samples = pcm16_to_float32(pcm)
+    return samples, samples[:TARGET_SAMPLE_RATE * 30]
+
+
+def measure(fn, repeats):
+    cpu, wall, peak = [], [], []
+    for _ in range(repeats):
+        tracemalloc.start()
+        c0, w0 = time.process_time(), time.perf_counter()
+        fn()
+        cpu.append(time.process_time() - c0)
+        wall.append(time.perf_counter() - w0)
+        peak.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return {
+        "cpu_ms": statistics.median(cpu) * 1000,
+        "wall_ms": statistics.median(wall) * 1000,
+        "peak_mb": statistics.median(peak) / 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=60.0)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        raw_path = Path(tmp) / "raw.wav"
+        clean_path = Path(tmp) / "clean.wav"
+        make_fixture(raw_path, args.seconds)
+
+        general = measure(lambda: general_path(raw_path, clean_path), args.repeats)
+        fast = measure(lambda: fast_path(raw_path), args.repeats)
+
+    print(f"Fixture: {args.seconds}s 16kHz mono PCM16, median of {args.repeats} runs")
+    print(f"{'path':<10}{'cpu ms':>10}{'wall ms':>10}{'peak MB':>10}")
+    for name, r in (("general", general), ("fast", fast)):
+        print(f"{name:<10}{r['cpu_ms']:>10.1f}{r['wall_ms']:>10.1f}{r['peak_mb']:>10.1f}")
+    print(
+        f"savings   {general['cpu_ms'] - fast['cpu_ms']:>10.1f}"
+        f"{general['wall_ms'] - fast['wall_ms']:>10.1f}"
+        f"{general['peak_mb'] - fast['peak_mb']:>10.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,32 @@
 #!/bin/bash
 source .venv/bin/activate
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+
+# WORKERS=N (N > 1) runs one shared inference server that owns the model,
+# plus N uvicorn workers that talk to it over a unix socket + shared memory.
+WORKERS=${WORKERS:-1}
+
+if [ "$WORKERS" -gt 1 ]; then
+    export PRONOUNCE_INFERENCE_ADDRESS=${PRONOUNCE_INFERENCE_ADDRESS:-/tmp/pronounce-infer.sock}
+    python -m backend.app.inference_server --address "$PRONOUNCE_INFERENCE_ADDRESS" &
+    INFERENCE_PID=$!
+    trap 'kill $INFERENCE_PID' EXIT
+
+    # Wait for the model to load before accepting HTTP traffic
+    # (the server only listens once it is loaded: socket file or TCP port)
+    inference_ready() {
+        if [[ "$PRONOUNCE_INFERENCE_ADDRESS" == *:* ]]; then
+            python -c 'import socket, sys; host, _, port = sys.argv[1].rpartition(":"); socket.create_connection((host or "127.0.0.1", int(port)), timeout=1).close()' \
+                "$PRONOUNCE_INFERENCE_ADDRESS" 2>/dev/null
+        else
+            [ -S "$PRONOUNCE_INFERENCE_ADDRESS" ]
+        fi
+    }
+    until inference_ready; do
+        kill -0 $INFERENCE_PID 2>/dev/null || { echo "Inference server exited before it was ready" >&2; exit 1; }
+        sleep 1
+    done
+
+    uvicorn backend.app.main:app --host 0.0.0.0 --port 8000 --workers "$WORKERS"
+else
+    uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
+fi
@@ -1,12 +1,17 @@
 import streamlit as st
 import requests
+import io
+import html
+import json
 import time
-import threading
-import itertools
 import textwrap
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from streamlit.runtime.scriptrunner import add_script_run_ctx
+from requests.adapters import HTTPAdapter
+from pydub import AudioSegment
+import numpy as np
+import soundfile as sf
 
 # -----------------------------
 # Configuration
@@ -31,8 +36,12 @@ load_css()
 
 # API Config
 BACKEND_URL = "http://localhost:8000/process-audio/"
+STREAM_URL = BACKEND_URL + "stream"   # same pipeline, reported as server-sent events
 PASSAGE_URL = "http://localhost:8000/get-passage/"
 
+# Upload Format (matches the backend's 16kHz mono 16-bit pipeline)
+UPLOAD_SAMPLE_RATE = 16000
+
 LANGUAGES = {
     "English": "en",
     "Hindi (हिंदी)": "hi",
@@ -42,6 +51,105 @@ LANGUAGES = {
     "Gujarati (ગુજરાતી)": "gu",
 }
 
+# -----------------------------
+# Networking Helpers
+# -----------------------------
+
+@st.cache_resource
+def get_http_session():
+    """
+    One pooled HTTP session per Streamlit server process.
+    Keeps TCP/TLS connections to the backend alive across reruns.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_resource
+def get_prefetch_pool():
+    """Background fetches (the next passage per language), shared by all sessions."""
+    return ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+
+def fetch_passage(session, language):
+    r = session.get(PASSAGE_URL, params={"language": language}, timeout=10)
+    r.raise_for_status()
+    return r.json()["passage"]
+
+def prefetch_passage(language):
+    """Starts fetching the next passage for `language` unless one is already pending."""
+    pending = st.session_state.setdefault("passage_prefetch", {})
+    if language not in pending:
+        # The session is resolved here: Streamlit caches can't be used from the pool threads
+        pending[language] = get_prefetch_pool().submit(fetch_passage, get_http_session(), language)
+
+def next_passage(language):
+    """Returns the prefetched passage (fetching now if it isn't there) and queues the one after."""
+    pending = st.session_state.setdefault("passage_prefetch", {})
+    future = pending.pop(language, None)
+    try:
+        passage = future.result(timeout=10) if future else fetch_passage(get_http_session(), language)
+    except Exception:
+        # Prefetch failed (e.g. backend was restarting); one direct attempt
+        passage = fetch_passage(get_http_session(), language)
+    prefetch_passage(language)
+    return passage
+
+def prepare_upload(audio_file):
+    """
+    Downsamples the browser recording to 16kHz mono and FLAC-compresses it.
+    The backend reduces everything to this format anyway, so the extra
+    sample rate / channels are wasted bytes on the wire.
+
+    Returns (payload_bytes, filename, mime, stats). Falls back to the
+    original recording if conversion fails.
+    """
+    audio_file.seek(0)
+    raw_bytes = audio_file.read()
+    start = time.time()
+
+    try:
+        audio = AudioSegment.from_file(io.BytesIO(raw_bytes))
+        audio = audio.set_frame_rate(UPLOAD_SAMPLE_RATE).set_channels(1).set_sample_width(2)
+        samples = np.array(audio.get_array_of_samples(), dtype=np.int16)
+
+        buf = io.BytesIO()
+        sf.write(buf, samples, UPLOAD_SAMPLE_RATE, format="FLAC", subtype="PCM_16")
+        payload, filename, mime = buf.getvalue(), "recording.flac", "audio/flac"
+    except Exception:
+        payload, filename, mime = raw_bytes, "recording.webm", "audio/webm"
+
+    stats = {
+        "original_bytes": len(raw_bytes),
+        "upload_bytes": len(payload),
+        "encode_sec": round(time.time() - start, 3),
+        "format": filename.rsplit(".", 1)[-1],
+    }
+    return payload, filename, mime, stats
+
+def render_upload_stats(stats, request_sec, server_sec):
+    """Debug-panel summary of upload savings."""
+    original = stats["original_bytes"]
+    uploaded = stats["upload_bytes"]
+    saved = max(0, original - uploaded)
+    ratio = original / uploaded if uploaded else 1.0
+
+    # Network time ≈ round trip minus server-side processing.
+    # Throughput from that gives an estimate of the time the skipped bytes would have cost.
+    network_sec = max(request_sec - server_sec, 0.001)
+    est_saved_sec = saved / (uploaded / network_sec) if uploaded else 0.0
+
+    return f"""
+    <div class="metric-container">
+        <div class="metric-label">Upload ({stats['format'].upper()})</div>
+        <div class="sub-metric">
+            {original / 1024:.1f} KB → {uploaded / 1024:.1f} KB ({ratio:.1f}× smaller) ·
+            encode {stats['encode_sec']}s · network {network_sec:.2f}s ·
+            ~{est_saved_sec:.2f}s upload saved
+        </div>
+    </div>"""
+
 # -----------------------------
 # Rendering Helpers (FIXED)
 # -----------------------------
@@ -51,7 +159,7 @@ def render_comparison_table(error_list):
     if not error_list:
         return "<div class='metric-success' style='padding:10px; text-align:center;'>🎉 Perfect Reading! Zero specific errors detected.</div>"
 
-    rows = ""
+    rows = []
     for err in error_list:
         e_type = err['type']
         expected = err['expected']
@@ -75,11 +183,12 @@ def render_comparison_table(error_list):
             badge = "<span class='badge badge-ins'>Added</span>"
             actual_html = f"<span style='color:#fd7e14;'>{actual}</span>"
 
-        rows += f"""<tr>
+        rows.append(f"""<tr>
             <td>{badge}</td>
             <td><strong>{expected}</strong></td>
             <td>{actual_html}</td>
-        </tr>"""
+        </tr>""")
+    rows = "".join(rows)
 
     return textwrap.dedent(f"""
     <div style="overflow-x:auto;">
@@ -121,17 +230,18 @@ def render_terminal_logs(logs):
     """Generates the Hacker-style Terminal HTML."""
     if not logs: return ""
 
-    log_lines = ""
+    log_lines = []
     for log in logs:
         ts = datetime.fromtimestamp(log['timestamp']).strftime('%H:%M:%S')
         lvl = log['level']
         msg = log['message']
         
-        log_lines += f"""<div class="log-entry">
+        log_lines.append(f"""<div class="log-entry">
             <span class="log-timestamp">[{ts}]</span>
             <span class="log-{lvl}">{lvl}</span>
             <span class="log-message">{msg}</span>
-        </div>"""
+        </div>""")
+    log_lines = "".join(log_lines)
 
     return textwrap.dedent(f"""
     <div class="terminal-window">
@@ -148,33 +258,81 @@ def render_terminal_logs(logs):
     </div>
     """)
 
+def cached_render(result_id, name, render_fn, *args):
+    """
+    Memoizes rendered HTML per result. Reruns (tab clicks, widget changes)
+    reuse it instead of rebuilding; a new result replaces the whole cache.
+    """
+    cache = st.session_state.setdefault("render_cache", {})
+    if cache.get("_result_id") != result_id:
+        cache.clear()
+        cache["_result_id"] = result_id
+    if name not in cache:
+        cache[name] = render_fn(*args)
+    return cache[name]
+
 # -----------------------------
-# Dynamic Loading Logic (FIXED)
+# Live Progress (server-sent events)
 # -----------------------------
-def cycle_status_messages(placeholder, stop_event):
+
+# Friendly message per pipeline stage reported by /process-audio/stream
+STAGE_MESSAGES = {
+    "sending": "📤 Sending your reading...",
+    "received": "👂 Listening to your lovely voice...",
+    "decoded": "🐢 Catching all the words...",
+    "segment": "🐢 Catching all the words...",
+    "scored": "🎉 Putting it all together...",
+}
+
+def read_events(response):
+    """Yields (event, data) from a server-sent event stream; keepalives are skipped."""
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line is None or line.startswith(":"):
+            continue
+        if not line:
+            if event:
+                yield event, json.loads("\n".join(data))
+            event, data = None, []
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].lstrip())
+
+def show_stage(placeholder, stage, partial_text=""):
+    # Friendly blue/purple color, centered text; the words heard so far below
+    partial = (
+        f"<p style='text-align: center; color: #9a8c98; font-style: italic;'>{html.escape(partial_text)}</p>"
+        if partial_text else ""
+    )
+    placeholder.markdown(
+        f"<h3 style='text-align: center; color: #4a4e69; font-family: sans-serif; padding: 20px;'>"
+        f"{STAGE_MESSAGES[stage]}</h3>{partial}",
+        unsafe_allow_html=True
+    )
+
+def stream_assessment(files, data, placeholder):
     """
-    Updates a Streamlit placeholder with friendly, encouraging messages.
+    Posts the recording to the streaming endpoint, showing each stage and the
+    partial transcript as it arrives. Returns the final result; raises
+    RuntimeError with the backend's message on failure.
     """
-    messages = [
-        "👂 Listening to your lovely voice...",
-        "✨ You sound amazing!",
-        "🐢 Catching all the words...",
-        "🌟 Checking for magic stars...",
-        "📚 Almost ready...",
-        "🎉 Putting it all together...",
-    ]
-    
-    # Cycle through messages indefinitely
-    for msg in itertools.cycle(messages):
-        if stop_event.is_set():
-            break
-        
-        # Friendly blue/purple color, centered text
-        placeholder.markdown(
-            f"<h3 style='text-align: center; color: #4a4e69; font-family: sans-serif; padding: 20px;'>{msg}</h3>", 
-            unsafe_allow_html=True
-        )
-        time.sleep(1.5)
+    show_stage(placeholder, "sending")
+    heard = []
+    # Read timeout only bounds the gap between events (the backend sends keepalives)
+    with get_http_session().post(STREAM_URL, files=files, data=data, stream=True, timeout=(10, 120)) as response:
+        if response.status_code != 200:
+            raise RuntimeError(response.text)
+        for event, payload in read_events(response):
+            if event == "result":
+                return payload
+            if event == "error":
+                raise RuntimeError(f"{payload.get('status')}: {payload.get('detail')}")
+            if event == "segment":
+                heard.append(payload.get("text", ""))
+            if event in STAGE_MESSAGES:
+                show_stage(placeholder, event, " ".join(heard))
+    raise RuntimeError("Stream ended without a result")
 
 # -----------------------------
 # UI Application
@@ -192,17 +350,20 @@ with col_lang:
 if "current_passage" not in st.session_state:
     st.session_state.current_passage = "Click 'New Passage' to start."
 
+# Have the next passage for this language ready before it's asked for
+prefetch_passage(lang_code)
+
 with col_btn:
     if st.button("🔄 New Passage", use_container_width=True):
         try:
             with st.spinner("Fetching text..."):
-                r = requests.get(PASSAGE_URL, params={"language": lang_code})
-                if r.status_code == 200:
-                    data = r.json()
-                    st.session_state.current_passage = data["passage"]
-                    st.rerun()
-        except:
+                st.session_state.current_passage = next_passage(lang_code)
+            # The old result belongs to the old text
+            st.session_state.pop("last_result", None)
+        except Exception:
             st.error("Backend Down")
+        else:
+            st.rerun()
 
 # Dynamic Height for Text Area
 text_len = len(st.session_state.current_passage)
@@ -222,156 +383,164 @@ if audio_data:
     
     if st.button("Analyze Reading", type="primary", use_container_width=True):
         
-        # Prepare file for upload
-        audio_data.seek(0)
-        files = {"file": ("recording.webm", audio_data, "audio/webm")}
+        # Prepare file for upload (16kHz mono FLAC)
+        payload, filename, mime, upload_stats = prepare_upload(audio_data)
+        files = {"file": (filename, payload, mime)}
         data = {"target_text": target_text, "language": lang_code}
         
-        # --- DYNAMIC LOADING ANIMATION ---
+        # --- LIVE PROGRESS (stage events + partial text from the backend) ---
         status_placeholder = st.empty()
-        stop_event = threading.Event()
-        
-        # Start the background thread
-        loader_thread = threading.Thread(
-            target=cycle_status_messages, 
-            args=(status_placeholder, stop_event)
-        )
-        
-        # IMPORTANT: Attach Streamlit Context to the thread so it can write to UI
-        add_script_run_ctx(loader_thread)
-        
-        loader_thread.start()
         
         try:
-            # Main synchronous API call
-            response = requests.post(BACKEND_URL, files=files, data=data)
-            
-            # Stop the animation
-            stop_event.set()
-            loader_thread.join()
-            status_placeholder.empty() # Clear the loading text
+            request_start = time.time()
+            result = stream_assessment(files, data, status_placeholder)
+            request_sec = time.time() - request_start
+            status_placeholder.empty() # Clear the progress text
             
-            if response.status_code != 200:
-                st.error(f"Error: {response.text}")
-                st.stop()
-                
-            result = response.json()
+        except RuntimeError as e:
+            status_placeholder.empty()
+            st.error(f"Error: {e}")
+            st.stop()
             
         except Exception as e:
-            stop_event.set()
             status_placeholder.empty()
             st.error(f"Connection Error: {e}")
             st.stop()
 
-        # -----------------------------
-        # TABBED RESULTS
-        # -----------------------------
+        # Keep the result across reruns; rendering below is served from cache
+        st.session_state.last_result = {
+            "result": result,
+            "upload_stats": upload_stats,
+            "request_sec": request_sec,
+            "target_text": target_text,
+            "recording_id": audio_data.file_id,
+        }
+
+# Only show a result for the text and recording on screen now
+last = st.session_state.get("last_result")
+if last and (
+    last["target_text"] != target_text
+    or audio_data is None
+    or last["recording_id"] != audio_data.file_id
+):
+    st.session_state.pop("last_result", None)
+    last = None
+
+if last:
+    result = last["result"]
+    result_id = result.get("meta", {}).get("session_id") or id(result)
+
+    # -----------------------------
+    # TABBED RESULTS
+    # -----------------------------
+    st.divider()
+    
+    # Extract Data
+    metrics = result.get("metrics", {})
+    scores = result.get("components", {})
+    alignment = result.get("word_alignment", [])
+    error_list = result.get("error_analysis", [])
+    logs = result.get("logs", [])
+    
+    t1, t2, t3, t4 = st.tabs(["📊 Summary", "🔍 Errors", "📖 Text", "💻 Logs"])
+
+    # --- TAB 1: SUMMARY (UPDATED) ---
+    with t1:
+        st.subheader("Performance Overview")
+        
+        # --- ROW 1: SUCCESS METRICS (Positive Reinforcement) ---
+        c1, c2, c3 = st.columns(3)
+        
+        # 1. Accuracy
+        c1.metric("Overall Accuracy", f"{metrics.get('accuracy', 0)}%")
+        
+        # 2. Fluency (Now using the Calculated Score)
+        c2.metric("Fluency Score", f"{metrics.get('fluency', 0)}/100")
+        
+        # 3. Correct Words (NEW: Green Card for Motivation)
+        correct_n = metrics.get("correct_count", 0)
+        c3.markdown(f"""
+        <div class="metric-container" style="border-left: 5px solid #28a745;">
+            <div class="metric-label">Words Read Perfectly</div>
+            <div class="metric-value" style="color:#28a745">✨ {correct_n}</div>
+            <div class="sub-metric">Great job!</div>
+        </div>""", unsafe_allow_html=True)
+        
         st.divider()
         
-        # Extract Data
-        metrics = result.get("metrics", {})
-        scores = result.get("components", {})
-        alignment = result.get("word_alignment", [])
-        error_list = result.get("error_analysis", [])
-        logs = result.get("logs", [])
+        # --- ROW 2: AREAS TO IMPROVE ---
+        k1, k2, k3, k4 = st.columns(4)
         
-        t1, t2, t3, t4 = st.tabs(["📊 Summary", "🔍 Errors", "📖 Text", "💻 Logs"])
-
-        # --- TAB 1: SUMMARY (UPDATED) ---
-        with t1:
-            st.subheader("Performance Overview")
-            
-            # --- ROW 1: SUCCESS METRICS (Positive Reinforcement) ---
-            c1, c2, c3 = st.columns(3)
-            
-            # 1. Accuracy
-            c1.metric("Overall Accuracy", f"{metrics.get('accuracy', 0)}%")
-            
-            # 2. Fluency (Now using the Calculated Score)
-            c2.metric("Fluency Score", f"{metrics.get('fluency', 0)}/100")
-            
-            # 3. Correct Words (NEW: Green Card for Motivation)
-            correct_n = metrics.get("correct_count", 0)
-            c3.markdown(f"""
-            <div class="metric-container" style="border-left: 5px solid #28a745;">
-                <div class="metric-label">Words Read Perfectly</div>
-                <div class="metric-value" style="color:#28a745">✨ {correct_n}</div>
-                <div class="sub-metric">Great job!</div>
-            </div>""", unsafe_allow_html=True)
-            
-            st.divider()
-            
-            # --- ROW 2: AREAS TO IMPROVE ---
-            k1, k2, k3, k4 = st.columns(4)
-            
-            # Mispronounced
-            mis = metrics.get("mispronunciation_count", 0)
-            k1.markdown(f"""
-            <div class="metric-container">
-                <div class="metric-label">Mispronounced</div>
-                <div class="metric-value" style="color:#f08c00">{mis}</div>
-                <div class="sub-metric">Close attempts</div>
-            </div>""", unsafe_allow_html=True)
-            
-            # Wrong Words
-            sub = metrics.get("substitution_count", 0)
-            k2.markdown(f"""
-            <div class="metric-container">
-                <div class="metric-label">Wrong Words</div>
-                <div class="metric-value" style="color:#dc3545">{sub}</div>
-                <div class="sub-metric">Try again</div>
-            </div>""", unsafe_allow_html=True)
-            
-            # Skipped
-            dele = metrics.get("deletion_count", 0)
-            k3.markdown(f"""
-            <div class="metric-container">
-                <div class="metric-label">Skipped Words</div>
-                <div class="metric-value" style="color:#6c757d">{dele}</div>
-                <div class="sub-metric">Missed</div>
-            </div>""", unsafe_allow_html=True)
-            
-            # Stutters
-            stut = metrics.get("stutter_count", 0)
-            k4.markdown(f"""
-            <div class="metric-container">
-                <div class="metric-label">Stutters</div>
-                <div class="metric-value" style="color:#ffc107">{stut}</div>
-                <div class="sub-metric">Repeats</div>
-            </div>""", unsafe_allow_html=True)
-
-            # --- ROW 3: SPEEDOMETER ---
-            st.markdown("<br>", unsafe_allow_html=True)
-            wpm = metrics.get('wpm', 0)
-            
-            display_wpm = min(wpm, 200)
-            marker_pos = (display_wpm / 200) * 100
-            
-            if wpm < 80: speed_text = "Slow"
-            elif wpm > 160: speed_text = "Fast"
-            else: speed_text = "Optimal"
-
-            st.markdown(f"""
-            <div class="speed-container">
-                <div class="metric-label">Speaking Pace: {wpm} Words Per Min ({speed_text})</div>
-                <div class="speed-bar-bg">
-                    <div class="speed-marker" style="left: {marker_pos}%;"></div>
-                </div>
+        # Mispronounced
+        mis = metrics.get("mispronunciation_count", 0)
+        k1.markdown(f"""
+        <div class="metric-container">
+            <div class="metric-label">Mispronounced</div>
+            <div class="metric-value" style="color:#f08c00">{mis}</div>
+            <div class="sub-metric">Close attempts</div>
+        </div>""", unsafe_allow_html=True)
+        
+        # Wrong Words
+        sub = metrics.get("substitution_count", 0)
+        k2.markdown(f"""
+        <div class="metric-container">
+            <div class="metric-label">Wrong Words</div>
+            <div class="metric-value" style="color:#dc3545">{sub}</div>
+            <div class="sub-metric">Try again</div>
+        </div>""", unsafe_allow_html=True)
+        
+        # Skipped
+        dele = metrics.get("deletion_count", 0)
+        k3.markdown(f"""
+        <div class="metric-container">
+            <div class="metric-label">Skipped Words</div>
+            <div class="metric-value" style="color:#6c757d">{dele}</div>
+            <div class="sub-metric">Missed</div>
+        </div>""", unsafe_allow_html=True)
+        
+        # Stutters
+        stut = metrics.get("stutter_count", 0)
+        k4.markdown(f"""
+        <div class="metric-container">
+            <div class="metric-label">Stutters</div>
+            <div class="metric-value" style="color:#ffc107">{stut}</div>
+            <div class="sub-metric">Repeats</div>
+        </div>""", unsafe_allow_html=True)
+
+        # --- ROW 3: SPEEDOMETER ---
+        st.markdown("<br>", unsafe_allow_html=True)
+        wpm = metrics.get('wpm', 0)
+        
+        display_wpm = min(wpm, 200)
+        marker_pos = (display_wpm / 200) * 100
+        
+        if wpm < 80: speed_text = "Slow"
+        elif wpm > 160: speed_text = "Fast"
+        else: speed_text = "Optimal"
+
+        st.markdown(f"""
+        <div class="speed-container">
+            <div class="metric-label">Speaking Pace: {wpm} Words Per Min ({speed_text})</div>
+            <div class="speed-bar-bg">
+                <div class="speed-marker" style="left: {marker_pos}%;"></div>
             </div>
-            """, unsafe_allow_html=True)
-
-        # --- TAB 2: ERROR TABLE ---
-        with t2:
-            st.subheader("Word-by-Word Analysis")
-            st.markdown(render_comparison_table(error_list), unsafe_allow_html=True)
-
-        # --- TAB 3: HIGHLIGHTED TEXT ---
-        with t3:
-            st.subheader("Visual Feedback")
-            html_view = render_highlighted_passage(alignment)
-            st.markdown(f"<div class='passage-box'>{html_view}</div>", unsafe_allow_html=True)
-
-        # --- TAB 4: SYSTEM LOGS ---
-        with t4:
-            st.subheader("Backend Logs")
-            st.markdown(render_terminal_logs(logs), unsafe_allow_html=True)
\ No newline at end of file
+        </div>
+        """, unsafe_allow_html=True)
+
+    # --- TAB 2: ERROR TABLE ---
+    with t2:
+        st.subheader("Word-by-Word Analysis")
+        st.markdown(cached_render(result_id, "errors", render_comparison_table, error_list), unsafe_allow_html=True)
+
+    # --- TAB 3: HIGHLIGHTED TEXT ---
+    with t3:
+        st.subheader("Visual Feedback")
+        html_view = cached_render(result_id, "passage", render_highlighted_passage, alignment)
+        st.markdown(f"<div class='passage-box'>{html_view}</div>", unsafe_allow_html=True)
+
+    # --- TAB 4: SYSTEM LOGS ---
+    with t4:
+        st.subheader("Backend Logs")
+        server_sec = result.get("meta", {}).get("latency_sec", 0)
+        st.markdown(render_upload_stats(last["upload_stats"], last["request_sec"], server_sec), unsafe_allow_html=True)
+        st.markdown(cached_render(result_id, "logs", render_terminal_logs, logs), unsafe_allow_html=True)
\ No newline at end of file